@@ -0,0 +1,169 @@
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from discrete_batch import FAMILY_NAMES, TAIL_EPS, pmf_table
+
+# Таблица Уокера/Воуза: значение = offset + номер столбца; в столбце j с
+# вероятностью threshold[j] / 2^32 берется j, иначе alias[j].
+# Число столбцов - степень двойки 2^bits (лишние столбцы с нулевой вероятностью)
+AliasTable = namedtuple('AliasTable', ['offset', 'threshold', 'alias', 'bits', 'truncated_mass'])
+
+DEFAULT_CHUNK = 1 << 22
+
+# Семейства, у которых PMF считается только в окне mean ± WINDOW_SD * sd
+# (+ WINDOW_PAD значений), а не по всему носителю
+WINDOWED = ('binom', 'poisson', 'hypergeom')
+WINDOW_SD = 12
+WINDOW_PAD = 10
+
+# Геометрическое распределение с хвостом длиннее MAX_GEOM_COLUMNS значений
+# выбирается обращением функции распределения, а не по таблице
+MAX_GEOM_COLUMNS = 1 << 22
+
+
+def build_alias_table(pmf):
+    """
+    Пороги (доли 2^32) и альтернативы метода Воуза для вектора вероятностей pmf
+    (дополненного нулями до степени двойки) и показатель этой степени.
+    """
+    pmf = np.asarray(pmf, dtype=float)
+    bits = max(int(pmf.size - 1).bit_length(), 1)
+    size = 1 << bits
+    pmf = np.concatenate([pmf, np.zeros(size - pmf.size)])
+    scaled = pmf * (size / pmf.sum())
+    prob = np.ones(size)
+    alias = np.arange(size)
+    small = np.flatnonzero(scaled < 1.0)
+    large = np.flatnonzero(scaled >= 1.0)
+    if small.size and large.size:
+        # Векторная форма прохода Воуза (малые и большие - по порядку): на общей
+        # оси недостач малых столбцов большой j закрывает малые, чья недостача
+        # начинается в [E[j-1], E[j]) (E - накопленные избытки больших), а свою
+        # перерасходованную часть - выход последнего из них за E[j] - берет у j+1
+        deficit = 1.0 - scaled[small]
+        end = np.cumsum(deficit)
+        start = end - deficit
+        excess = np.cumsum(scaled[large] - 1.0)
+        owner = np.minimum(np.searchsorted(excess, start, side='right'), large.size - 1)
+        prob[small] = scaled[small]
+        alias[small] = large[owner]
+        cut = excess[:-1]
+        last = np.minimum(np.searchsorted(end, cut, side='right'), small.size - 1)
+        over = np.where((end[last] > cut) & (start[last] < cut), end[last] - cut, 0.0)
+        prob[large[:-1]] = np.clip(1.0 - over, 0.0, 1.0)
+        alias[large[:-1]] = large[1:]
+    # Последний большой столбец (и погрешности округления) заполнен целиком: его
+    # альтернатива - сам столбец, поэтому порог 2^32 - 1 вместо 2^32 не важен
+    threshold = np.minimum(np.round(prob * 2.0**32), 2.0**32 - 1).astype(np.uint32)
+    return threshold, alias.astype(np.uint32), bits
+
+
+def _window(family, params):
+    """Сетка значений mean ± WINDOW_SD * sd для семейств с легкими хвостами."""
+    if FAMILY_NAMES.get(family, family) not in WINDOWED:
+        return None
+    moments = pmf_table(family, k=np.zeros(1, dtype=np.int64), **params)
+    mean, sd = float(moments.mean[0]), float(np.sqrt(moments.var[0]))
+    lo = max(int(np.floor(mean - WINDOW_SD * sd)) - WINDOW_PAD, 0)
+    hi = int(np.ceil(mean + WINDOW_SD * sd)) + WINDOW_PAD
+    return np.arange(lo, hi + 1)
+
+
+@lru_cache(maxsize=256)
+def alias_table(family, eps=1e-15, **params):
+    """
+    Таблица псевдонимов для семейства family (код или название из topic5).
+
+    PMF считается пакетным движком discrete_batch в окне вокруг среднего
+    (binom, poisson, hypergeom) или на автоматической сетке, поэтому размер
+    таблицы не зависит от размера носителя. Хвосты суммарной массой не больше
+    eps отбрасываются, остаток нормируется. Таблицы кэшируются для каждого
+    набора параметров. truncated_mass - оценка отброшенной массы (не меньше 0;
+    ее точность ограничена точностью PMF, при n ~ 1e9 - около 1e-6).
+    """
+    table = pmf_table(family, k=_window(family, params), **params)
+    k, pmf = table.k, table.pmf[0]
+    cdf = np.cumsum(pmf)
+    total = cdf[-1]
+    lo = np.searchsorted(cdf, eps / 2 * total, side='right')
+    hi = np.searchsorted(cdf, total * (1 - eps / 2), side='left')
+    hi = min(max(hi, lo), k.size - 1)
+    kept = pmf[lo:hi + 1]
+    truncated = max(float(1.0 - kept.sum()), 0.0)
+    threshold, alias, bits = build_alias_table(kept)
+    return AliasTable(int(k[lo]), threshold, alias, bits, truncated)
+
+
+def _fill(table, out, rng):
+    """Заполняет out выборкой: одно 64-битное слово на значение."""
+    words = rng.bit_generator.random_raw(out.size)
+    # Слово - две 32-битные половины: одна - "монета" внутри столбца, старшие
+    # bits другой - номер столбца (порядок половин не важен). Вся арифметика
+    # 32-битная, выбор между столбцом и альтернативой - без булевой индексации
+    halves = words.view(np.uint32).reshape(-1, 2)
+    column = halves[:, 1] >> np.uint32(32 - table.bits)
+    choice = np.where(halves[:, 0] < table.threshold[column], column, table.alias[column])
+    np.copyto(out, choice, casting='unsafe')
+    out += table.offset
+
+
+def _fill_geom(p, shift, out, rng):
+    """Геометрическое распределение обращением: floor(ln(1 - U) / ln(1 - p)) + shift."""
+    values = np.log1p(-rng.random(out.size))
+    values /= np.log1p(-p)
+    np.floor(values, out=values)
+    np.copyto(out, values, casting='unsafe')
+    out += shift
+
+
+def _filler(family, params):
+    """
+    Функция fill(out, rng) для семейства: таблица псевдонимов или, для
+    геометрического распределения с очень длинным хвостом, обращение.
+    """
+    if FAMILY_NAMES.get(family, family) == 'geom':
+        p = float(params['p'])
+        if 0 < p < 1 and np.log(TAIL_EPS) / np.log1p(-p) > MAX_GEOM_COLUMNS:
+            shift = 1 if params.get('count', 'failures') == 'trials' else 0
+            return lambda out, rng: _fill_geom(p, shift, out, rng)
+    table = alias_table(family, **params)
+    return lambda out, rng: _fill(table, out, rng)
+
+
+def sample(family, size, rng=None, out=None, chunk_size=DEFAULT_CHUNK, **params):
+    """
+    Выборка объема size из семейства family за O(1) на значение.
+
+    Значения пишутся порциями по chunk_size в заранее выделенный массив out
+    (int64 по умолчанию), поэтому временная память не зависит от size.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    fill = _filler(family, params)
+    if out is None:
+        out = np.empty(size, dtype=np.int64)
+    flat = out.reshape(-1)
+    for start in range(0, flat.size, chunk_size):
+        fill(flat[start:start + chunk_size], rng)
+    return out
+
+
+def sample_stream(family, total, rng=None, chunk_size=DEFAULT_CHUNK, **params):
+    """
+    Поток выборки общим объемом total порциями по chunk_size.
+
+    Каждая порция пишется в один и тот же буфер: его нужно обработать
+    (или скопировать) до получения следующей.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    fill = _filler(family, params)
+    buffer = np.empty(min(int(total), chunk_size), dtype=np.int64)
+    remaining = int(total)
+    while remaining > 0:
+        chunk = buffer[:min(chunk_size, remaining)]
+        fill(chunk, rng)
+        yield chunk
+        remaining -= chunk.size
@@ -0,0 +1,245 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+from parallel_engine import make_generator
+
+DEFAULT_SIZES = (10**3, 10**4, 10**5, 10**6)
+DEFAULT_OUT = 'benchmark_results.json'
+DEFAULT_BASELINE = 'benchmark_baseline.json'
+# Допустимое замедление / рост памяти относительно базовой линии
+DEFAULT_TOLERANCE = 0.25
+# Времена короче этого порога сравниваются как равные ему (шум таймера)
+MIN_SECONDS = 1e-3
+# Рост памяти меньше этого порога не считается регрессией (байт)
+MIN_MEMORY = 1 << 20
+
+
+# === ЯДРА ТЕМ ===
+# setup(n, rng) готовит данные (не входит в замер) и возвращает функцию без аргументов
+
+def _topic1_zones(n, rng):
+    from geometric_engine import count_ring_zones
+    return lambda: count_ring_zones(2.0, [0.3, 0.7, 1.0], n, rng=rng)
+
+
+def _topic2_frequency(n, rng):
+    from coin_engine import frequency_chunks
+
+    def run():
+        for _ in frequency_chunks(n, rng):
+            pass
+    return run
+
+
+def _categorical(rng, n, n_values):
+    import pandas as pd
+    codes = rng.integers(0, n_values, n, dtype=np.int8)
+    return pd.Categorical.from_codes(codes, [f'v{i}' for i in range(n_values)])
+
+
+def _topic3_bayes(n, rng):
+    import pandas as pd
+    from count_cube import CountCube
+    df = pd.DataFrame({'sex': _categorical(rng, n, 2), 'education': _categorical(rng, n, 16),
+                       'income': _categorical(rng, n, 2)})
+    event, evidence = {'income': 'v1'}, {'sex': 'v0'}
+
+    def run():
+        cube = CountCube.from_frame(df, ['sex', 'education', 'income'])
+        cube.conditional_table('education', 'income')
+        return cube.bayes_inverse(event, evidence)
+    return run
+
+
+def _topic4_simpson(n, rng):
+    import pandas as pd
+    from simpson_scanner import scan_simpson
+    df = pd.DataFrame({'treatment': rng.integers(0, 2, n, dtype=np.int8),
+                       'outcome': rng.integers(0, 2, n, dtype=np.int8)})
+    for i in range(4):
+        df[f'stratum{i}'] = rng.integers(0, 8, n, dtype=np.int8)
+    strata = [f'stratum{i}' for i in range(4)]
+    return lambda: scan_simpson(df, 'treatment', 'outcome', strata, workers=1)
+
+
+def _topic5_pmf(n, rng):
+    from discrete_batch import binom_table
+    k = np.arange(64)
+    p = np.linspace(0.01, 0.99, max(n // k.size, 1))
+    return lambda: binom_table(k.size - 1, p, k=k)
+
+
+def _topic6_moments(n, rng):
+    from scipy.stats import rv_continuous
+    from streaming_moments import sampled_moments
+    from tabulated_sampler import TabulatedSampler
+
+    class Parabolic(rv_continuous):
+        def _pdf(self, x):
+            return np.where((x >= -1) & (x <= 1), 0.75 * (1 - x**2), 0)
+
+    sampler = TabulatedSampler(Parabolic(a=-1, b=1, name='Parabolic'))
+    sampler.table()  # таблица CDF строится при подготовке
+    return lambda: sampled_moments(n, rng, sampler)
+
+
+def _topic7_sweep(n, rng):
+    from scipy.stats import lognorm
+    from param_sweep import sweep
+    x = np.linspace(0, 5, 1000)
+    sigmas = np.linspace(0.1, 1.5, max(n // x.size, 1))
+    return lambda: sweep(lognorm, x, what=('pdf',), s=sigmas)
+
+
+# Ядро: (подготовка, наибольший объем, единица объема). Ограничение объема -
+# для ядер, которым нужны данные или результат размера n в памяти
+KERNELS = {
+    'topic1.zones': (_topic1_zones, None, 'точек'),
+    'topic2.frequency': (_topic2_frequency, None, 'бросков'),
+    'topic3.bayes': (_topic3_bayes, 10**8, 'записей'),
+    'topic4.simpson': (_topic4_simpson, 10**8, 'записей'),
+    'topic5.pmf': (_topic5_pmf, 10**8, 'ячеек PMF'),
+    'topic6.moments': (_topic6_moments, None, 'значений'),
+    'topic7.sweep': (_topic7_sweep, 10**8, 'точек сетки'),
+}
+
+
+def measure(kernel, n, repeats=3, seed=42, memory=True):
+    """
+    Замер одного ядра на объеме n: лучшее время из repeats прогонов и
+    (отдельным прогоном под tracemalloc) пиковая память выделений Python/numpy.
+    """
+    setup, _, unit = KERNELS[kernel]
+    run = setup(n, make_generator(seed))
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    seconds = min(times)
+    peak = None
+    if memory:
+        tracemalloc.start()
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {
+        'kernel': kernel,
+        'size': int(n),
+        'unit': unit,
+        'seconds': seconds,
+        'throughput': n / seconds if seconds > 0 else None,
+        'peak_tracemalloc_bytes': peak,
+    }
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Сравнение с базовой линией по совпадающим (ядро, объем). Добавляет к
+    результатам отношения и возвращает список описаний регрессий.
+    """
+    base = {(r['kernel'], r['size']): r for r in baseline['results']}
+    regressions = []
+    for r in results:
+        b = base.get((r['kernel'], r['size']))
+        if b is None:
+            continue
+        r['time_ratio'] = max(r['seconds'], MIN_SECONDS) / max(b['seconds'], MIN_SECONDS)
+        if r['time_ratio'] > 1 + tolerance:
+            regressions.append(f"{r['kernel']} n={r['size']:.0e}: время {b['seconds']:.4f} -> "
+                               f"{r['seconds']:.4f} с (x{r['time_ratio']:.2f})")
+        peak, base_peak = r['peak_tracemalloc_bytes'], b.get('peak_tracemalloc_bytes')
+        if peak is not None and base_peak is not None:
+            r['memory_ratio'] = peak / max(base_peak, 1)
+            if peak > base_peak * (1 + tolerance) and peak - base_peak > MIN_MEMORY:
+                regressions.append(f"{r['kernel']} n={r['size']:.0e}: память {base_peak:,} -> "
+                                   f"{peak:,} байт (x{r['memory_ratio']:.2f})")
+    return regressions
+
+
+def environment():
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Замеры производительности ядер тем.")
+    parser.add_argument('kernels', nargs='*', help=f"ядра (по умолчанию все): {', '.join(KERNELS)}")
+    parser.add_argument('--sizes', nargs='+', type=float, default=DEFAULT_SIZES,
+                        help="объемы, например 1e3 1e6 1e9")
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-memory', action='store_true', help="без прогона под tracemalloc")
+    parser.add_argument('-o', '--out', default=DEFAULT_OUT, help="файл результатов (JSON)")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="файл базовой линии (JSON)")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="сохранить результаты как новую базовую линию")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    kernels = args.kernels or list(KERNELS)
+    unknown = [k for k in kernels if k not in KERNELS]
+    if unknown:
+        parser.error(f"неизвестные ядра: {', '.join(unknown)}")
+
+    results = []
+    print(f"{'Ядро':<18} {'N':>8} {'время, с':>10} {'в секунду':>12} {'память, МБ':>11}")
+    for kernel in kernels:
+        max_size = KERNELS[kernel][1]
+        for n in map(int, args.sizes):
+            if max_size is not None and n > max_size:
+                print(f"{kernel:<18} {n:>8.0e}   пропуск (больше {max_size:.0e})")
+                continue
+            r = measure(kernel, n, args.repeats, args.seed, memory=not args.no_memory)
+            results.append(r)
+            mem = r['peak_tracemalloc_bytes']
+            print(f"{kernel:<18} {n:>8.0e} {r['seconds']:>10.4f} {r['throughput']:>12.3g} "
+                  f"{(mem or 0) / 2**20:>11.1f}")
+
+    regressions = []
+    missing_baseline = not args.save_baseline and not os.path.exists(args.baseline)
+    if not args.save_baseline and not missing_baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+
+    report = {'environment': environment(), 'tolerance': args.tolerance,
+              'results': results, 'regressions': regressions}
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=1)
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=1)
+        print(f"Базовая линия сохранена: {args.baseline}")
+
+    if regressions:
+        print("\n" + "!" * 60, file=sys.stderr)
+        print(f"РЕГРЕССИИ ПРОИЗВОДИТЕЛЬНОСТИ (допуск {args.tolerance:.0%}):", file=sys.stderr)
+        for line in regressions:
+            print("  " + line, file=sys.stderr)
+        print("!" * 60, file=sys.stderr)
+        return 1
+    # Без базовой линии сравнивать не с чем: такой запуск не считается успешным
+    if missing_baseline:
+        print("\n" + "!" * 60, file=sys.stderr)
+        print(f"БАЗОВАЯ ЛИНИЯ {args.baseline} НЕ НАЙДЕНА: регрессии не проверялись.", file=sys.stderr)
+        print("Создайте ее на эталонной машине флагом --save-baseline.", file=sys.stderr)
+        print("!" * 60, file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
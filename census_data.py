@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+from urllib.error import URLError
+from urllib.request import urlretrieve
+
+import numpy as np
+import pandas as pd
+
+# Набор данных Adult Census (Данные переписи населения)
+ADULT_URL = "https://raw.githubusercontent.com/jbrownlee/Datasets/master/adult-all.csv"
+ADULT_COLUMNS = ['age', 'workclass', 'fnlwgt', 'education', 'education_num', 'marital_status',
+                 'occupation', 'relationship', 'race', 'sex', 'capital_gain', 'capital_loss',
+                 'hours_per_week', 'native_country', 'income']
+
+# Явные типы: категории вместо object и минимальные целые вместо int64
+CATEGORICAL_COLUMNS = ['workclass', 'education', 'marital_status', 'occupation',
+                       'relationship', 'race', 'sex', 'native_country', 'income']
+NUMERIC_DTYPES = {
+    'age': np.uint8,
+    'fnlwgt': np.uint32,
+    'education_num': np.uint8,
+    'capital_gain': np.uint32,
+    'capital_loss': np.uint16,
+    'hours_per_week': np.uint8,
+}
+
+# Путь к локальной копии CSV можно задать переменной окружения
+DEFAULT_CSV_PATH = os.environ.get('ADULT_CSV', os.path.join('data', 'adult-all.csv'))
+MANIFEST_NAME = 'manifest.json'
+CACHE_VERSION = 1
+
+
+def file_checksum(path, block_size=1 << 20):
+    """SHA-256 содержимого файла (читается блоками)."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_adult_csv(path):
+    """Разбор CSV с явными типами столбцов."""
+    dtypes = {col: 'category' for col in CATEGORICAL_COLUMNS}
+    dtypes.update(NUMERIC_DTYPES)
+    return pd.read_csv(path, names=ADULT_COLUMNS, na_values='?',
+                       skipinitialspace=True, dtype=dtypes)
+
+
+def write_cache(df, cache_dir, source_stat, checksum):
+    """Сохраняет столбцы в виде .npy (категории - коды + список значений)."""
+    os.makedirs(cache_dir, exist_ok=True)
+    columns = {}
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            values = df[col].cat.codes.to_numpy()
+            columns[col] = {'kind': 'category', 'categories': df[col].cat.categories.tolist()}
+        else:
+            values = df[col].to_numpy()
+            columns[col] = {'kind': 'numeric'}
+        # Запись через временный файл: старый кэш может быть отображен в память
+        path = os.path.join(cache_dir, f'{col}.npy')
+        with open(path + '.tmp', 'wb') as f:
+            np.save(f, values)
+        os.replace(path + '.tmp', path)
+    manifest = {
+        'version': CACHE_VERSION,
+        'sha256': checksum,
+        'size': source_stat.st_size,
+        'mtime_ns': source_stat.st_mtime_ns,
+        'rows': int(len(df)),
+        'columns': columns,
+    }
+    # Манифест пишется последним: неполный кэш без него считается отсутствующим
+    _write_manifest(cache_dir, manifest)
+    return manifest
+
+
+def _write_manifest(cache_dir, manifest):
+    tmp_path = os.path.join(cache_dir, MANIFEST_NAME + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp_path, os.path.join(cache_dir, MANIFEST_NAME))
+
+
+def read_cache(cache_dir, manifest):
+    """DataFrame поверх отображенных в память .npy-файлов кэша."""
+    data = {}
+    for col, meta in manifest['columns'].items():
+        values = np.load(os.path.join(cache_dir, f'{col}.npy'), mmap_mode='r')
+        if meta['kind'] == 'category':
+            dtype = pd.CategoricalDtype(meta['categories'])
+            data[col] = pd.Categorical.from_codes(values, dtype=dtype, validate=False)
+        else:
+            data[col] = values
+    return pd.DataFrame(data, copy=False)
+
+
+def _load_manifest(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, MANIFEST_NAME), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get('version') == CACHE_VERSION else None
+
+
+def cache_is_valid(manifest, csv_path, source_stat):
+    """
+    Кэш актуален, если совпадает контрольная сумма исходного CSV.
+
+    Сумма пересчитывается только при изменении размера или времени
+    модификации файла, чтобы повторный запуск не читал CSV целиком.
+    """
+    if manifest is None:
+        return False, None
+    if (manifest['size'] == source_stat.st_size
+            and manifest['mtime_ns'] == source_stat.st_mtime_ns):
+        return True, manifest['sha256']
+    checksum = file_checksum(csv_path)
+    return checksum == manifest['sha256'], checksum
+
+
+def load_adult(csv_path=None, cache_dir=None, download=False):
+    """
+    Загрузка Adult Census с локальным столбцовым кэшем.
+
+    Первый запуск разбирает CSV с явными типами и сохраняет кэш в cache_dir
+    (по умолчанию рядом с CSV), последующие - отображают .npy-файлы в память.
+    При изменении CSV (по SHA-256) кэш перестраивается. Если файла нет и
+    download=True, он один раз скачивается из ADULT_URL; без сети (как и при
+    download=False) - FileNotFoundError с указанием ожидаемого пути.
+    """
+    csv_path = csv_path or DEFAULT_CSV_PATH
+    cache_dir = cache_dir or csv_path + '.cache'
+    if not os.path.exists(csv_path):
+        missing = f"Нет файла {csv_path}: укажите путь или переменную ADULT_CSV"
+        if not download:
+            raise FileNotFoundError(missing)
+        os.makedirs(os.path.dirname(csv_path) or '.', exist_ok=True)
+        try:
+            # Через временный файл: прерванная загрузка не оставляет неполный CSV
+            urlretrieve(ADULT_URL, csv_path + '.tmp')
+        except (URLError, OSError) as exc:
+            if os.path.exists(csv_path + '.tmp'):
+                os.remove(csv_path + '.tmp')
+            raise FileNotFoundError(f"{missing} (загрузка {ADULT_URL} не удалась: {exc})") from exc
+        os.replace(csv_path + '.tmp', csv_path)
+
+    source_stat = os.stat(csv_path)
+    manifest = _load_manifest(cache_dir)
+    valid, checksum = cache_is_valid(manifest, csv_path, source_stat)
+    if valid:
+        if manifest['mtime_ns'] != source_stat.st_mtime_ns:
+            # Содержимое то же - обновляем только отметку времени
+            manifest['mtime_ns'] = source_stat.st_mtime_ns
+            _write_manifest(cache_dir, manifest)
+        return read_cache(cache_dir, manifest)
+
+    df = read_adult_csv(csv_path)
+    manifest = write_cache(df, cache_dir, source_stat, checksum or file_checksum(csv_path))
+    return read_cache(cache_dir, manifest)
@@ -0,0 +1,127 @@
+import numpy as np
+
+# Бросков в одном 64-битном слове генератора
+BITS_PER_WORD = 64
+# Бюджет слов на одну порцию (R путей x столбцы слов): 32 МБ uint64
+DEFAULT_CHUNK_WORDS = 1 << 22
+
+if hasattr(np, 'bitwise_count'):
+    def popcount(words):
+        """Число единичных битов в каждом слове uint64."""
+        return np.bitwise_count(words)
+else:
+    _BYTE_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+    def popcount(words):
+        """Число единичных битов в каждом слове uint64 (таблица по байтам)."""
+        words = np.ascontiguousarray(words, dtype='<u8')
+        by_byte = _BYTE_POPCOUNT[words.view(np.uint8)]
+        return by_byte.reshape(words.shape + (8,)).sum(axis=-1, dtype=np.uint8)
+
+
+def random_words(rng, shape):
+    """Сырые 64-битные слова генератора битов: каждое слово - 64 броска монеты."""
+    size = int(np.prod(shape))
+    return rng.bit_generator.random_raw(size).reshape(shape)
+
+
+def _low_bits_mask(r):
+    """Маска младших r бит (0 <= r < 64) - первые r бросков слова."""
+    return np.uint64((1 << int(r)) - 1)
+
+
+def toss_bits(n, rng):
+    """Последовательность n бросков 0/1 (uint8), распакованная из слов генератора."""
+    n_words = -(-int(n) // BITS_PER_WORD)
+    words = random_words(rng, n_words).astype('<u8', copy=False)
+    return np.unpackbits(words.view(np.uint8), bitorder='little')[:n]
+
+
+def count_heads(n, rng, chunk_words=DEFAULT_CHUNK_WORDS):
+    """
+    Число орлов в n бросках правильной монеты.
+
+    Слова генератора обрабатываются порциями, орлы считаются через popcount,
+    хвост последнего неполного слова маскируется. Сигнатура совместима
+    с parallel_engine.parallel_simulate.
+    """
+    n = int(n)
+    full_words, tail = divmod(n, BITS_PER_WORD)
+    heads = 0
+    while full_words > 0:
+        m = min(chunk_words, full_words)
+        heads += int(popcount(random_words(rng, m)).sum(dtype=np.int64))
+        full_words -= m
+    if tail:
+        last = random_words(rng, 1)[0] & _low_bits_mask(tail)
+        heads += int(popcount(last))
+    return heads
+
+
+def frequency_chunks(n, rng, chunk_tosses=1 << 24):
+    """
+    Поток накопленной частоты орлов k(t)/t, t = 1..n, порциями по chunk_tosses.
+
+    В памяти одновременно находится только одна порция; предназначено для
+    потокового прореживания (decimation.decimate_stream) при огромных n.
+    """
+    n = int(n)
+    chunk_tosses = max(BITS_PER_WORD, int(chunk_tosses) // BITS_PER_WORD * BITS_PER_WORD)
+    heads, done = 0, 0
+    while done < n:
+        m = min(chunk_tosses, n - done)
+        cumulative = np.cumsum(toss_bits(m, rng), dtype=np.int64)
+        cumulative += heads
+        heads = int(cumulative[-1])
+        yield cumulative / np.arange(done + 1, done + m + 1)
+        done += m
+
+
+def path_checkpoints(n_paths, rng, n_trials, checkpoints=None, chunk_words=DEFAULT_CHUNK_WORDS):
+    """
+    Число орлов в n_paths независимых путях на номерах испытаний checkpoints.
+
+    Вычисление блочное по матрице R x N: в памяти одновременно находится лишь
+    порция из R x (chunk_words // R) слов и бегущие суммы по путям. Возвращает
+    массив int64 формы (n_paths, len(checkpoints)); частоты - деление на checkpoints.
+    Первый аргумент - число путей, поэтому пути можно распределить между
+    процессами через parallel_simulate(..., merge=lambda a, b: np.concatenate([a, b])).
+    """
+    n_paths, n_trials = int(n_paths), int(n_trials)
+    if checkpoints is None:
+        checkpoints = np.array([n_trials])
+    checkpoints = np.asarray(checkpoints, dtype=np.int64)
+    if checkpoints.size and (checkpoints.min() < 1 or checkpoints.max() > n_trials
+                             or np.any(np.diff(checkpoints) < 0)):
+        raise ValueError("checkpoints должны неубывать в пределах [1, n_trials]")
+
+    # Для каждой точки: индекс слова, в котором она лежит, и число бросков в нем
+    word_idx, tail = np.divmod(checkpoints - 1, BITS_PER_WORD)
+    tail += 1
+    masks = np.where(tail == BITS_PER_WORD, np.uint64(2**64 - 1),
+                     (np.uint64(1) << tail.astype(np.uint64)) - np.uint64(1))
+
+    result = np.empty((n_paths, checkpoints.size), dtype=np.int64)
+    running = np.zeros(n_paths, dtype=np.int64)
+    n_words = -(-n_trials // BITS_PER_WORD)
+    cols = max(1, chunk_words // max(n_paths, 1))
+
+    w0 = 0
+    while w0 < n_words:
+        w1 = min(w0 + cols, n_words)
+        words = random_words(rng, (n_paths, w1 - w0))
+        counts = popcount(words).astype(np.int64)
+        # cum[:, j] - орлы до начала слова w0 + j
+        cum = np.empty((n_paths, w1 - w0 + 1), dtype=np.int64)
+        cum[:, 0] = running
+        np.cumsum(counts, axis=1, out=cum[:, 1:])
+        cum[:, 1:] += running[:, None]
+
+        lo, hi = np.searchsorted(word_idx, [w0, w1], side='left')
+        if hi > lo:
+            local = word_idx[lo:hi] - w0
+            partial_heads = popcount(words[:, local] & masks[lo:hi]).astype(np.int64)
+            result[:, lo:hi] = cum[:, local] + partial_heads
+        running = cum[:, -1]
+        w0 = w1
+    return result
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+# Способы генерации реплик по счетчикам ячеек
+METHODS = ('multinomial', 'poisson', 'dirichlet')
+
+
+def replicate_counts(counts, n_replicates, rng, method='multinomial', prior=0.5):
+    """
+    n_replicates реплик таблицы счетчиков, форма (n_replicates, *counts.shape).
+
+    multinomial - классический бутстреп (выборка N записей с возвращением),
+    poisson     - бутстреп с пуассоновскими весами (счетчик ячейки ~ Poisson(n)),
+    dirichlet   - апостериорные доли ячеек Dirichlet(n + prior) для байесовских
+                  интервалов (масштаб не важен, так как все запросы - отношения).
+    Стоимость зависит только от числа ячеек, но не от числа записей.
+    """
+    counts = np.asarray(counts)
+    flat = counts.ravel()
+    size = (int(n_replicates), flat.size)
+    if method == 'multinomial':
+        total = int(flat.sum())
+        draws = rng.multinomial(total, flat / total, size=n_replicates)
+    elif method == 'poisson':
+        draws = rng.poisson(flat, size=size)
+    elif method == 'dirichlet':
+        draws = rng.standard_gamma(flat + prior, size=size)
+    else:
+        raise ValueError(f"Неизвестный метод {method!r}, допустимы: {METHODS}")
+    return draws.reshape((int(n_replicates),) + counts.shape)
+
+
+def probability_intervals(cube, queries, n_replicates=10000, level=0.95,
+                          method='multinomial', rng=None):
+    """
+    Интервалы для вероятностей P(event | given) куба частот.
+
+    queries: {название: (event, given)}. Все реплики генерируются одним
+    вызовом, после чего каждая вероятность считается как операция над
+    массивом реплик. Возвращает DataFrame со столбцами estimate, low, high, se.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    replicas = replicate_counts(cube.counts, n_replicates, rng, method)
+    alpha = (1 - level) / 2
+    rows = {}
+    for name, (event, given) in queries.items():
+        values = cube.probability(event, given, counts=replicas)
+        low, high = np.nanquantile(values, [alpha, 1 - alpha])
+        rows[name] = {
+            'estimate': cube.probability(event, given),
+            'low': low,
+            'high': high,
+            'se': np.nanstd(values, ddof=1),
+        }
+    return pd.DataFrame.from_dict(rows, orient='index')
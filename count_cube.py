@@ -0,0 +1,167 @@
+import numpy as np
+import pandas as pd
+
+
+class CountCube:
+    """
+    Куб частот (многомерная таблица сопряженности) по категориальным признакам.
+
+    Строится за один проход: коды признаков объединяются в один индекс
+    ячейки и подсчитываются через bincount. Последний индекс по каждой оси
+    отведен под пропуски (NaN). Все вероятности - условные, маргинальные,
+    обратные по Байесу - вычисляются по счетчикам без обращения к данным,
+    а новые записи добавляются через append без перестроения.
+    """
+
+    def __init__(self, categories):
+        # categories: {признак: список значений}
+        self.dims = list(categories)
+        self.categories = {dim: pd.Index(values) for dim, values in categories.items()}
+        self._positions = {dim: {v: i for i, v in enumerate(values)}
+                           for dim, values in self.categories.items()}
+        shape = tuple(len(self.categories[dim]) + 1 for dim in self.dims)
+        self.counts = np.zeros(shape, dtype=np.int64)
+
+    @classmethod
+    def from_frame(cls, df, dims):
+        """Куб по столбцам dims таблицы df."""
+        categories = {}
+        for dim in dims:
+            col = df[dim]
+            if not isinstance(col.dtype, pd.CategoricalDtype):
+                col = col.astype('category')
+            categories[dim] = col.cat.categories
+        cube = cls(categories)
+        cube.append(df)
+        return cube
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    def _codes(self, df, dim):
+        """Коды значений столбца в категориях куба (новые значения добавляются)."""
+        col = df[dim]
+        known = self.categories[dim]
+        if isinstance(col.dtype, pd.CategoricalDtype) and col.cat.categories.equals(known):
+            codes = col.cat.codes.to_numpy()
+        else:
+            values = pd.Index(col.dropna().unique())
+            new_values = values.difference(known, sort=False)
+            if len(new_values):
+                self._grow(dim, new_values)
+                known = self.categories[dim]
+            codes = known.get_indexer(col)
+        # Пропуски (-1) переносятся в последнюю ячейку оси
+        return np.where(codes < 0, len(known), codes).astype(np.int64)
+
+    def _grow(self, dim, new_values):
+        axis = self.dims.index(dim)
+        n_old = len(self.categories[dim])
+        self.categories[dim] = self.categories[dim].append(pd.Index(new_values))
+        self._positions[dim] = {v: i for i, v in enumerate(self.categories[dim])}
+        pad_width = [(0, 0)] * self.counts.ndim
+        pad_width[axis] = (0, len(new_values))
+        grown = np.pad(self.counts, pad_width)
+        # Ячейка пропусков должна остаться последней
+        grown = np.moveaxis(grown, axis, 0)
+        grown[[n_old, -1]] = grown[[-1, n_old]]
+        self.counts = np.ascontiguousarray(np.moveaxis(grown, 0, axis))
+
+    def append(self, df):
+        """Добавляет записи df к счетчикам (инкрементальное обновление)."""
+        codes = [self._codes(df, dim) for dim in self.dims]
+        flat = np.ravel_multi_index(codes, self.counts.shape)
+        self.counts += np.bincount(flat, minlength=self.counts.size).reshape(self.counts.shape)
+        return self
+
+    def _position(self, dim, value):
+        try:
+            return self._positions[dim][value]
+        except KeyError:
+            raise KeyError(f"Неизвестное значение признака {dim}: {value!r}") from None
+
+    def _sum(self, conditions, known=(), counts=None):
+        """
+        Сумма счетчиков по ячейкам, где признаки принимают заданные значения
+        (скаляр или список), а признаки known не пропущены.
+
+        counts - альтернативные счетчики той же формы, возможно с ведущими
+        осями (например, реплики бутстрепа); тогда результат - массив по ним.
+        """
+        if counts is None:
+            counts = self.counts
+        lead = counts.ndim - self.counts.ndim
+        index, lists = [slice(None)] * lead, []
+        reduced_axis = lead
+        for dim in self.dims:
+            if dim in conditions and np.ndim(conditions[dim]) == 0:
+                index.append(self._position(dim, conditions[dim]))
+                continue
+            if dim in conditions:
+                lists.append((reduced_axis, [self._position(dim, v) for v in conditions[dim]]))
+                index.append(slice(None))
+            elif dim in known:
+                index.append(slice(0, len(self.categories[dim])))
+            else:
+                index.append(slice(None))
+            reduced_axis += 1
+        # Скаляры и срезы - представление без копирования, списки - через take
+        sub = counts[tuple(index)]
+        for axis, pos in lists:
+            sub = np.take(sub, pos, axis=axis)
+        if lead:
+            return sub.reshape(sub.shape[:lead] + (-1,)).sum(axis=-1)
+        return int(sub.sum())
+
+    def count(self, **conditions):
+        """Число записей, удовлетворяющих условиям признак=значение (или список значений)."""
+        return self._sum(conditions)
+
+    def probability(self, event, given=None, counts=None):
+        """
+        P(event | given) по счетчикам.
+
+        Знаменатель - записи, удовлетворяющие given, у которых признаки
+        события известны (как в pd.crosstab, пропуски не учитываются).
+        При counts с ведущими осями возвращается массив вероятностей.
+        """
+        given = dict(given or {})
+        overlap = set(event) & set(given)
+        if overlap:
+            raise ValueError(f"Признаки {overlap} заданы и в событии, и в условии")
+        numerator = self._sum({**event, **given}, counts=counts)
+        denominator = self._sum(given, known=event.keys(), counts=counts)
+        if np.ndim(denominator):
+            with np.errstate(invalid='ignore', divide='ignore'):
+                return numerator / denominator
+        return numerator / denominator if denominator else np.nan
+
+    def bayes_inverse(self, event, evidence, counts=None):
+        """
+        P(evidence | event) - обратная вероятность из формулы Байеса
+        P(event | evidence) P(evidence) / P(event). Считается прямо по счетчикам:
+        у трех множителей формулы разные знаменатели (пропуски в разных
+        признаках), и их произведение не равно отношению частот.
+        """
+        return self.probability(evidence, event, counts)
+
+    def conditional_table(self, row_dim, col_dim, rows=None):
+        """Таблица P(col_dim | row_dim) - аналог pd.crosstab(..., normalize='index')."""
+        axes = tuple(i for i, dim in enumerate(self.dims) if dim not in (row_dim, col_dim))
+        table = self.counts.sum(axis=axes)
+        if self.dims.index(row_dim) > self.dims.index(col_dim):
+            table = table.T
+        # Без ячеек пропусков
+        table = table[:-1, :-1]
+        index = self.categories[row_dim]
+        if rows is not None:
+            # Как фильтр isin: порядок категорий, неизвестные метки пропускаются
+            pos = index.get_indexer(rows)
+            pos = np.unique(pos[pos >= 0])
+            table, index = table[pos], index[pos]
+        nonzero = table.sum(axis=1) > 0
+        table, index = table[nonzero], index[nonzero]
+        return pd.DataFrame(table / table.sum(axis=1, keepdims=True),
+                            index=pd.Index(index, name=row_dim),
+                            columns=pd.Index(self.categories[col_dim], name=col_dim))
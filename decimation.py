@@ -0,0 +1,97 @@
+import numpy as np
+
+
+class StreamingMinMaxDecimator:
+    """
+    Потоковое прореживание ряда y(1), ..., y(n_total) для отрисовки.
+
+    Ось x делится на n_columns столбцов (по числу пикселей). Для каждого
+    столбца хранятся только первая, последняя, минимальная и максимальная
+    точки (алгоритм M4), поэтому все видимые выбросы сохраняются, а память
+    O(n_columns) не зависит от n_total. Дополнительно запоминаются точные
+    значения в log_points логарифмически расположенных точках начального
+    участка [1, head_end], где путь меняется сильнее всего.
+    """
+
+    def __init__(self, n_total, n_columns=2000, log_points=200, head_end=None):
+        self.n_total = int(n_total)
+        self.n_columns = int(max(1, min(n_columns, self.n_total)))
+        if head_end is None:
+            head_end = max(1, self.n_total // self.n_columns)
+        self.head_x = np.unique(np.geomspace(1, head_end, log_points).astype(np.int64))
+        self.head_y = np.full(self.head_x.size, np.nan)
+        self.offset = 0
+
+        shape = self.n_columns
+        self._seen = np.zeros(shape, dtype=bool)
+        self._first = np.zeros((2, shape))
+        self._last = np.zeros((2, shape))
+        self._min = np.zeros((2, shape))
+        self._max = np.zeros((2, shape))
+
+    def _columns(self, x):
+        return (x - 1) * self.n_columns // self.n_total
+
+    def feed(self, values):
+        """Следующая порция значений y для x = offset + 1, ..., offset + len(values)."""
+        values = np.asarray(values, dtype=float)
+        m = values.size
+        if m == 0:
+            return
+        if self.offset + m > self.n_total:
+            raise ValueError("Передано больше точек, чем n_total")
+        x0 = self.offset + 1
+
+        # Точные значения в логарифмических контрольных точках
+        lo = np.searchsorted(self.head_x, x0, side='left')
+        hi = np.searchsorted(self.head_x, x0 + m - 1, side='right')
+        if hi > lo:
+            self.head_y[lo:hi] = values[self.head_x[lo:hi] - x0]
+
+        # Столбцы идут подряд: границы отрезков порции считаются арифметически,
+        # без вычисления номера столбца для каждой точки
+        c0, c1 = self._columns(x0), self._columns(x0 + m - 1)
+        seg_cols = np.arange(c0, c1 + 1)
+        starts = -(-seg_cols * self.n_total // self.n_columns) + 1 - x0
+        starts[0] = 0
+        ends = np.r_[starts[1:], m]
+        seg_min = np.minimum.reduceat(values, starts)
+        seg_max = np.maximum.reduceat(values, starts)
+        argmin = np.array([s + values[s:e].argmin() for s, e in zip(starts, ends)])
+        argmax = np.array([s + values[s:e].argmax() for s, e in zip(starts, ends)])
+
+        new = ~self._seen[seg_cols]
+        fc = seg_cols[new]
+        self._first[0, fc] = x0 + starts[new]
+        self._first[1, fc] = values[starts[new]]
+        self._last[0, seg_cols] = x0 + ends - 1
+        self._last[1, seg_cols] = values[ends - 1]
+
+        take = new | (seg_min < self._min[1, seg_cols])
+        self._min[0, seg_cols[take]] = x0 + argmin[take]
+        self._min[1, seg_cols[take]] = seg_min[take]
+        take = new | (seg_max > self._max[1, seg_cols])
+        self._max[0, seg_cols[take]] = x0 + argmax[take]
+        self._max[1, seg_cols[take]] = seg_max[take]
+
+        self._seen[seg_cols] = True
+        self.offset += m
+
+    def vertices(self):
+        """Вершины прореженной линии (x, y), отсортированные по x без повторов."""
+        seen = self._seen
+        head = ~np.isnan(self.head_y)
+        xs = np.concatenate([self.head_x[head], self._first[0, seen], self._min[0, seen],
+                             self._max[0, seen], self._last[0, seen]])
+        ys = np.concatenate([self.head_y[head], self._first[1, seen], self._min[1, seen],
+                             self._max[1, seen], self._last[1, seen]])
+        xs, idx = np.unique(xs, return_index=True)
+        return xs, ys[idx]
+
+
+def decimate_stream(chunks, n_total, n_columns=2000, log_points=200):
+    """Прореживает поток порций значений (например, накопленных частот) для графика."""
+    decimator = StreamingMinMaxDecimator(n_total, n_columns, log_points)
+    for chunk in chunks:
+        decimator.feed(chunk)
+    return decimator.vertices()
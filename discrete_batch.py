@@ -0,0 +1,156 @@
+from collections import namedtuple
+
+import numpy as np
+from scipy.special import gammaln, xlog1py, xlogy
+
+# Результат пакетного расчета: сетка значений, матрица PMF (параметры x значения)
+# и массивы характеристик по наборам параметров
+PMFTable = namedtuple('PMFTable', ['k', 'pmf', 'mean', 'var', 'mode'])
+
+# Порог хвоста для автоматического выбора сетки значений
+TAIL_EPS = 1e-12
+
+
+# Наибольший размер таблицы ln(k!) (8 МБ); для больших k - прямой gammaln
+MAX_LOG_FACTORIAL = 1 << 20
+
+
+class LogFactorialTable:
+    """
+    Таблица ln(k!), лениво расширяемая (удвоением) при обращении к большим k.
+    Не растет дальше max_size: такие k вычисляются через gammaln.
+    """
+
+    def __init__(self, size=1024, max_size=MAX_LOG_FACTORIAL):
+        self.values = gammaln(np.arange(size) + 1.0)
+        self.max_size = max_size
+
+    def __call__(self, k):
+        k = np.asarray(k, dtype=np.int64)
+        need = int(k.max(initial=0)) + 1
+        if need > self.max_size:
+            return gammaln(k + 1.0)
+        if need > self.values.size:
+            size = min(max(need, 2 * self.values.size), self.max_size)
+            self.values = gammaln(np.arange(size) + 1.0)
+        return self.values[k]
+
+
+# Общая таблица для всех семейств
+log_factorial = LogFactorialTable()
+
+
+def _column(*params):
+    """Параметры как столбцы (m, 1) с общей длиной m для трансляции по сетке k."""
+    arrays = np.broadcast_arrays(*[np.atleast_1d(np.asarray(p)) for p in params])
+    return [a.reshape(-1, 1) for a in arrays]
+
+
+def _log_choose(n, k):
+    return log_factorial(n) - log_factorial(k) - log_factorial(n - k)
+
+
+def _grid(k, default_max):
+    if k is None:
+        return np.arange(int(default_max) + 1)
+    return np.asarray(k, dtype=np.int64)
+
+
+def binom_table(n, p, k=None):
+    """Биномиальное распределение Bin(n, p) для массивов n, p."""
+    n, p = _column(np.asarray(n, dtype=np.int64), np.asarray(p, dtype=float))
+    k = _grid(k, n.max())
+    inside = (k >= 0) & (k <= n)
+    kk = np.where(inside, k, 0)
+    logpmf = _log_choose(n, kk) + xlogy(kk, p) + xlog1py(n - kk, -p)
+    pmf = np.where(inside, np.exp(logpmf), 0.0)
+    n, p = n.ravel(), p.ravel()
+    mode = np.clip(np.ceil((n + 1) * p) - 1, 0, n).astype(np.int64)
+    return PMFTable(k, pmf, n * p, n * p * (1 - p), mode)
+
+
+def poisson_table(mu, k=None):
+    """Распределение Пуассона с параметрами mu (массив)."""
+    (mu,) = _column(np.asarray(mu, dtype=float))
+    k = _grid(k, np.ceil(mu.max() + 12 * np.sqrt(mu.max()) + 10))
+    inside = k >= 0
+    kk = np.where(inside, k, 0)
+    pmf = np.where(inside, np.exp(xlogy(kk, mu) - mu - log_factorial(kk)), 0.0)
+    mu = mu.ravel()
+    mode = np.maximum(np.ceil(mu) - 1, 0).astype(np.int64)
+    return PMFTable(k, pmf, mu, mu, mode)
+
+
+def geom_table(p, k=None, count='failures'):
+    """
+    Геометрическое распределение с вероятностями успеха p (массив).
+
+    count='failures' - число неудач до первого успеха (k = 0, 1, ...),
+    count='trials'   - номер первого успешного испытания (k = 1, 2, ..., как в scipy).
+    Вырожденные наборы p = 0 (успеха не бывает) дают нулевую строку PMF и
+    бесконечные среднее и дисперсию; сетка по умолчанию строится по p > 0.
+    """
+    if count not in ('failures', 'trials'):
+        raise ValueError("count должен быть 'failures' или 'trials'")
+    shift = 1 if count == 'trials' else 0
+    (p,) = _column(np.asarray(p, dtype=float))
+    if not ((p >= 0) & (p <= 1)).all():
+        raise ValueError("Вероятности успеха p должны лежать в [0, 1]")
+    positive = p[p > 0]
+    p_min = positive.min() if positive.size else 1.0
+    tail = np.ceil(np.log(TAIL_EPS) / np.log1p(-p_min)) if p_min < 1 else 0
+    k = _grid(k, tail + shift)
+    failures = k - shift
+    inside = failures >= 0
+    ff = np.where(inside, failures, 0)
+    with np.errstate(divide='ignore'):
+        pmf = np.where(inside, np.exp(np.log(p) + xlog1py(ff, -p)), 0.0)
+        p = p.ravel()
+        mean = (1 - p) / p + shift
+        var = (1 - p) / p**2
+    mode = np.full(p.shape, shift, dtype=np.int64)
+    return PMFTable(k, pmf, mean, var, mode)
+
+
+def hypergeom_table(N, K, n, k=None):
+    """
+    Гипергеометрическое распределение: n извлечений без возвращения
+    из N объектов, среди которых K "успешных" (массивы N, K, n).
+    """
+    N, K, n = _column(*(np.asarray(a, dtype=np.int64) for a in (N, K, n)))
+    k = _grid(k, np.minimum(K, n).max())
+    inside = (k >= np.maximum(0, n - (N - K))) & (k <= np.minimum(K, n))
+    kk = np.where(inside, k, np.minimum(K, n))
+    logpmf = _log_choose(K, kk) + _log_choose(N - K, n - kk) - _log_choose(N, n)
+    pmf = np.where(inside, np.exp(logpmf), 0.0)
+    N, K, n = N.ravel(), K.ravel(), n.ravel()
+    frac = K / N
+    with np.errstate(invalid='ignore', divide='ignore'):
+        var = n * frac * (1 - frac) * (N - n) / (N - 1)
+    var = np.where(N > 1, var, 0.0)
+    mode = np.ceil((n + 1) * (K + 1) / (N + 2)) - 1
+    mode = np.clip(mode, np.maximum(0, n - (N - K)), np.minimum(K, n)).astype(np.int64)
+    return PMFTable(k, pmf, n * frac, var, mode)
+
+
+# Семейства по именам
+FAMILIES = {
+    'binom': binom_table,
+    'poisson': poisson_table,
+    'geom': geom_table,
+    'hypergeom': hypergeom_table,
+}
+
+
+# Названия семейств, как в topic5 (dist_info)
+FAMILY_NAMES = {
+    'Биномиальное': 'binom',
+    'Пуассона': 'poisson',
+    'Геометрическое': 'geom',
+    'Гипергеом.': 'hypergeom',
+}
+
+
+def pmf_table(family, k=None, **params):
+    """Пакетный расчет PMF и характеристик для семейства family по массивам параметров."""
+    return FAMILIES[FAMILY_NAMES.get(family, family)](k=k, **params)
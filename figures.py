@@ -0,0 +1,25 @@
+import os
+
+from instrumentation import stage
+
+# Разрешение файлов рисунков в пакетном режиме
+DEFAULT_DPI = 120
+
+
+def show(name, out_dir=None, dpi=DEFAULT_DPI):
+    """
+    Вывод текущего рисунка: окно plt.show() в интерактивном режиме или,
+    если задан out_dir, файл out_dir/<name>.png (рисунок затем закрывается).
+    Возвращает путь к файлу или None.
+    """
+    import matplotlib.pyplot as plt
+
+    if out_dir is None:
+        plt.show()
+        return None
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f'{name}.png')
+    with stage(f'figure.{name}'):
+        plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+    return path
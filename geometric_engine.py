@@ -0,0 +1,56 @@
+import numpy as np
+
+# Размер порции точек: ~8 МБ на каждую координату (float64)
+DEFAULT_CHUNK = 1 << 20
+
+
+def ring_thresholds(side, radii):
+    """Квадраты радиусов в единицах стороны квадрата (для сравнения без sqrt)."""
+    r = np.asarray(radii, dtype=float)
+    if np.any(np.diff(r) <= 0):
+        raise ValueError("Радиусы должны строго возрастать")
+    return (r / side) ** 2
+
+
+def classify_ring_zones(x, y, side, radii):
+    """Номер зоны для каждой точки: 0 - внутренний круг, len(radii) - вне мишени."""
+    u = np.asarray(x, dtype=float) / side - 0.5
+    v = np.asarray(y, dtype=float) / side - 0.5
+    return np.searchsorted(ring_thresholds(side, radii), u * u + v * v, side='left')
+
+
+def count_ring_zones(side, radii, n_total, chunk_size=DEFAULT_CHUNK, rng=None):
+    """
+    Монте-Карло для кольцевой мишени с постоянным расходом памяти.
+
+    Точки генерируются порциями по chunk_size в заранее выделенные буферы,
+    каждая точка за один проход относится к своему кольцу (searchsorted по
+    квадратам радиусов), а накапливаются только целочисленные счетчики зон.
+    Возвращает массив int64 длины len(radii) + 1.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    thresholds = ring_thresholds(side, radii)
+    n_zones = len(thresholds) + 1
+    counts = np.zeros(n_zones, dtype=np.int64)
+
+    chunk_size = int(max(1, min(chunk_size, n_total)))
+    u = np.empty(chunk_size)
+    v = np.empty(chunk_size)
+
+    remaining = int(n_total)
+    while remaining > 0:
+        m = min(chunk_size, remaining)
+        um, vm = u[:m], v[:m]
+        # Координаты в единицах стороны, центр мишени в (0.5, 0.5)
+        rng.random(out=um)
+        rng.random(out=vm)
+        um -= 0.5
+        vm -= 0.5
+        np.multiply(um, um, out=um)
+        np.multiply(vm, vm, out=vm)
+        um += vm  # квадрат расстояния до центра
+        zone = np.searchsorted(thresholds, um, side='left')
+        counts += np.bincount(zone, minlength=n_zones)
+        remaining -= m
+    return counts
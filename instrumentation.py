@@ -0,0 +1,50 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# Накопленное время и число вызовов по этапам, значения счетчиков (на процесс)
+_stages = defaultdict(lambda: [0, 0.0])
+_counters = defaultdict(int)
+
+
+@contextmanager
+def stage(name):
+    """Замер времени этапа: with stage('topic1.simulate'): ..."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record = _stages[name]
+        record[0] += 1
+        record[1] += time.perf_counter() - start
+
+
+def count(name, n=1):
+    """Увеличивает счетчик name на n (число точек, бросков, значений и т.п.)."""
+    _counters[name] += int(n)
+
+
+def reset():
+    _stages.clear()
+    _counters.clear()
+
+
+def report():
+    """Снимок замеров: {'stages': {этап: {'calls', 'seconds'}}, 'counters': {...}}."""
+    return {
+        'stages': {name: {'calls': calls, 'seconds': seconds}
+                   for name, (calls, seconds) in _stages.items()},
+        'counters': dict(_counters),
+    }
+
+
+def format_report(snapshot=None):
+    """Текстовая таблица замеров: этапы по убыванию времени, затем счетчики."""
+    snapshot = snapshot or report()
+    lines = [f"{'Этап':<32} {'вызовов':>8} {'время, с':>10}"]
+    stages = sorted(snapshot['stages'].items(), key=lambda item: -item[1]['seconds'])
+    for name, rec in stages:
+        lines.append(f"{name:<32} {rec['calls']:>8} {rec['seconds']:>10.3f}")
+    for name, value in sorted(snapshot['counters'].items()):
+        lines.append(f"{name:<32} {value:>19,}")
+    return '\n'.join(lines)
@@ -1,16 +1,167 @@
-# This is a sample Python script.
+import argparse
+import ast
+import contextlib
+import importlib
+import inspect
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-# Press Shift+F10 to execute it or replace it with your code.
-# Press Double Shift to search everywhere for classes, files, tool windows, actions, and settings.
+import instrumentation
 
+_START = time.perf_counter()
 
-def print_hi(name):
-    # Use a breakpoint in the code line below to debug your script.
-    print(f'Hi, {name}')  # Press Ctrl+F8 to toggle the breakpoint.
+# Задания: имя -> модуль темы с функцией run(..., out_dir=None)
+JOBS = {
+    'topic1': 'topic1_geometric_probability',
+    'topic2': 'topic2_frequency_classical',
+    'topic3': 'topic3_conditional_probabilities',
+    'topic4': 'topic4_simpson_paradox',
+    'topic5': 'topic5_discrete_distributions',
+    'topic6': 'topic6_custom_distributions',
+    'topic7': 'topic7_parameter_dependence',
+}
 
+DEFAULT_OUT_DIR = 'results'
 
-# Press the green button in the gutter to run the script.
-if __name__ == '__main__':
-    print_hi('PyCharm')
 
-# See PyCharm help at https://www.jetbrains.com/help/pycharm/
+def job_parameters(name):
+    """Параметры задания и их значения по умолчанию (по сигнатуре run)."""
+    run = importlib.import_module(JOBS[name]).run
+    return {key: p.default for key, p in inspect.signature(run).parameters.items()
+            if key != 'out_dir'}
+
+
+def run_job(name, params, out_dir):
+    """
+    Выполнение одного задания в текущем процессе без окон: рисунки сохраняются
+    в out_dir/<name>/, консольный вывод - в out_dir/<name>/output.txt, замеры
+    этапов и счетчики темы - в out_dir/<name>/profile.json.
+    Возвращает (имя, время выполнения в секундах, замеры).
+    """
+    os.environ['MPLBACKEND'] = 'Agg'
+    job_dir = os.path.join(out_dir, name)
+    os.makedirs(job_dir, exist_ok=True)
+    instrumentation.reset()
+    start = time.perf_counter()
+    with open(os.path.join(job_dir, 'output.txt'), 'w', encoding='utf-8') as log, \
+            contextlib.redirect_stdout(log):
+        importlib.import_module(JOBS[name]).run(out_dir=job_dir, **params)
+    elapsed = time.perf_counter() - start
+    profile = {'job': name, 'seconds': elapsed, 'params': params, **instrumentation.report()}
+    with open(os.path.join(job_dir, 'profile.json'), 'w', encoding='utf-8') as f:
+        json.dump(profile, f, ensure_ascii=False, indent=1, default=repr)
+    return name, elapsed, profile
+
+
+def parse_overrides(items):
+    """
+    Значения параметров из аргументов вида [задание.]параметр=значение
+    (значение - литерал Python). Возвращает {задание или None: {параметр: значение}}.
+    """
+    overrides = {}
+    for item in items:
+        key, sep, value = item.partition('=')
+        if not sep:
+            raise ValueError(f"Ожидается параметр=значение, получено {item!r}")
+        job, _, param = key.rpartition('.')
+        if job and job not in JOBS:
+            raise ValueError(f"Неизвестное задание {job!r}")
+        try:
+            value = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            pass  # строка без кавычек, например путь
+        overrides.setdefault(job or None, {})[param] = value
+    return overrides
+
+
+def job_params(name, overrides, seed, concurrent):
+    """Параметры для run: общие и частные переопределения, seed и число процессов."""
+    accepted = job_parameters(name)
+    params = {}
+    if seed is not None and 'seed' in accepted:
+        params['seed'] = seed
+    # При параллельном запуске тем внутренний пул процессов не создается
+    if concurrent and 'workers' in accepted:
+        params['workers'] = 1
+    for key, value in overrides.get(None, {}).items():
+        if key in accepted:
+            params[key] = value
+    for key, value in overrides.get(name, {}).items():
+        if key not in accepted:
+            raise ValueError(f"У задания {name} нет параметра {key!r}")
+        params[key] = value
+    return params
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Пакетный запуск тем без окон: рисунки и вывод сохраняются в файлы.")
+    parser.add_argument('topics', nargs='*', help=f"задания (по умолчанию все): {', '.join(JOBS)}")
+    parser.add_argument('-o', '--out-dir', default=DEFAULT_OUT_DIR, help="каталог результатов")
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help="число процессов для параллельного запуска тем")
+    parser.add_argument('--seed', type=int, default=None, help="seed для всех заданий")
+    parser.add_argument('--set', dest='overrides', action='append', default=[],
+                        metavar='[ЗАДАНИЕ.]ПАРАМЕТР=ЗНАЧЕНИЕ',
+                        help="значение параметра, например topic1.n=1000000")
+    parser.add_argument('--list', action='store_true', help="список заданий и их параметров")
+    parser.add_argument('--profile', action='store_true',
+                        help="вывести замеры этапов и счетчики каждого задания")
+    args = parser.parse_args(argv)
+
+    topics = args.topics or list(JOBS)
+    unknown = [name for name in topics if name not in JOBS]
+    if unknown:
+        parser.error(f"неизвестные задания: {', '.join(unknown)}")
+
+    if args.list:
+        for name in topics:
+            params = ', '.join(f'{k}={v!r}' for k, v in job_parameters(name).items())
+            print(f"{name:<8} {JOBS[name]}({params})")
+        return 0
+
+    os.environ['MPLBACKEND'] = 'Agg'
+    workers = max(1, min(args.jobs, len(topics)))
+    try:
+        overrides = parse_overrides(args.overrides)
+        params = {name: job_params(name, overrides, args.seed, workers > 1) for name in topics}
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    print(f"Готовность к запуску: {time.perf_counter() - _START:.3f} с, "
+          f"заданий: {len(topics)}, процессов: {workers}")
+    wall_start = time.perf_counter()
+    failed = []
+
+    def report(name, future_result):
+        try:
+            _, elapsed, profile = future_result()
+            print(f"  {name:<8} {elapsed:8.2f} с  -> {os.path.join(args.out_dir, name)}")
+            if args.profile:
+                print(instrumentation.format_report(profile))
+        except Exception:
+            failed.append(name)
+            print(f"  {name:<8} ОШИБКА", file=sys.stderr)
+            traceback.print_exc()
+
+    if workers == 1:
+        for name in topics:
+            report(name, lambda: run_job(name, params[name], args.out_dir))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(run_job, name, params[name], args.out_dir): name
+                       for name in topics}
+            for future in as_completed(futures):
+                report(futures[future], future.result)
+
+    print(f"Общее время: {time.perf_counter() - wall_start:.2f} с"
+          + (f", с ошибками: {', '.join(failed)}" if failed else ""))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
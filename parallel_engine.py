@@ -0,0 +1,78 @@
+import operator
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+
+import numpy as np
+
+# Поддерживаемые генераторы битов (оба допускают независимые потоки через SeedSequence)
+BIT_GENERATORS = {
+    'pcg64': np.random.PCG64,
+    'philox': np.random.Philox,
+}
+
+# Размер одной задачи. Он НЕ зависит от числа процессов: именно поэтому
+# разбиение на задачи и их потоки случайных чисел одинаковы при любом workers.
+DEFAULT_TASK_SIZE = 1 << 24
+
+
+def make_generator(seed=None, bit_generator='pcg64'):
+    """Генератор numpy.random.Generator с заданным типом генератора битов."""
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return np.random.Generator(BIT_GENERATORS[bit_generator](seed))
+
+
+def spawn_generators(seed, n_streams, bit_generator='pcg64'):
+    """n_streams независимых дочерних генераторов от одного SeedSequence."""
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return [make_generator(child, bit_generator) for child in seed.spawn(n_streams)]
+
+
+def split_tasks(n_total, task_size=DEFAULT_TASK_SIZE):
+    """Размеры задач: все по task_size, кроме, возможно, последней."""
+    n_total, task_size = int(n_total), int(task_size)
+    sizes = [task_size] * (n_total // task_size)
+    if n_total % task_size:
+        sizes.append(n_total % task_size)
+    return sizes
+
+
+def _run_task(args):
+    fn, n, child_seed, bit_generator = args
+    return fn(n, rng=make_generator(child_seed, bit_generator))
+
+
+def parallel_simulate(fn, n_total, seed=None, workers=None,
+                      task_size=DEFAULT_TASK_SIZE, bit_generator='pcg64', merge=None):
+    """
+    Параллельное моделирование с воспроизводимыми независимыми потоками.
+
+    fn(n, rng=...) - функция уровня модуля (или functools.partial от нее),
+    моделирующая n испытаний и возвращающая частичный результат: счетчики зон,
+    число орлов, накопители моментов и т.п. Задача i всегда получает i-й дочерний
+    SeedSequence, а частичные результаты объединяются строго в порядке задач,
+    поэтому итог бит-в-бит совпадает при любом числе процессов.
+
+    merge(a, b) объединяет два частичных результата (по умолчанию a + b).
+    На платформах со spawn-запуском процессов вызывать из-под
+    `if __name__ == '__main__'`.
+    """
+    if merge is None:
+        merge = operator.add
+    sizes = split_tasks(n_total, task_size)
+    if not sizes:
+        raise ValueError("n_total должно быть положительным")
+    root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    tasks = [(fn, n, child, bit_generator) for n, child in zip(sizes, root.spawn(len(sizes)))]
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(int(workers), len(tasks))
+    if workers <= 1:
+        partials = map(_run_task, tasks)
+        return reduce(merge, partials)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # map сохраняет порядок задач -> детерминированное объединение
+        return reduce(merge, pool.map(_run_task, tasks))
@@ -0,0 +1,99 @@
+import os
+
+import numpy as np
+
+# Бюджет памяти на одну порцию расчета (байт)
+DEFAULT_BUDGET = 1 << 27
+
+# Во сколько раз временные массивы scipy больше результата порции
+WORK_FACTOR = 4
+
+
+def _method(dist, name):
+    """Метод распределения по имени; для дискретных семейств pdf означает pmf."""
+    if name == 'pdf' and not hasattr(dist, 'pdf'):
+        name = 'pmf'
+    return getattr(dist, name)
+
+
+def param_grid(**params):
+    """
+    Сетка параметров - декартово произведение массивов в порядке аргументов.
+    Возвращает форму сетки и плоские массивы параметров длины prod(shape).
+    """
+    axes = [np.atleast_1d(np.asarray(v, dtype=float)) for v in params.values()]
+    shape = tuple(a.size for a in axes)
+    mesh = np.meshgrid(*axes, indexing='ij')
+    return shape, {name: m.ravel() for name, m in zip(params, mesh)}
+
+
+def sweep(dist, x, what=('pdf', 'cdf'), memory_budget=DEFAULT_BUDGET, out_dir=None, **params):
+    """
+    Значения функций what распределения dist на сетке (параметры x значения x).
+
+    params - массивы параметров scipy (формы, loc, scale), по которым строится
+    сетка, например sweep(lognorm, x, s=sigmas, scale=np.exp(mus)).
+    Вычисление идет трансляцией по порциям строк сетки так, чтобы временные
+    массивы не превышали memory_budget. При заданном out_dir результаты
+    пишутся в файлы out_dir/<функция>.npy (np.memmap) для последующих срезов.
+    Возвращает словарь {функция: массив формы (*форма сетки, len(x))}.
+    """
+    x = np.asarray(x, dtype=float).ravel()
+    shape, flat = param_grid(**params)
+    n_rows = int(np.prod(shape))
+    full_shape = shape + (x.size,)
+
+    results = {}
+    for name in what:
+        if out_dir is None:
+            results[name] = np.empty(full_shape)
+        else:
+            os.makedirs(out_dir, exist_ok=True)
+            results[name] = np.lib.format.open_memmap(
+                os.path.join(out_dir, f'{name}.npy'), mode='w+', dtype=float, shape=full_shape)
+
+    row_bytes = x.size * 8 * WORK_FACTOR
+    chunk_rows = max(1, int(memory_budget // row_bytes))
+    methods = {name: _method(dist, name) for name in what}
+    for start in range(0, n_rows, chunk_rows):
+        stop = min(start + chunk_rows, n_rows)
+        args = {k: v[start:stop, None] for k, v in flat.items()}
+        for name, method in methods.items():
+            results[name].reshape(n_rows, x.size)[start:stop] = method(x, **args)
+
+    for arr in results.values():
+        if isinstance(arr, np.memmap):
+            arr.flush()
+    return results
+
+
+def sweep_moments(dist, moments='mvsk', **params):
+    """
+    Характеристики распределения по формулам scipy (dist.stats) на сетке параметров.
+    Возвращает словарь {'mean', 'var', 'skew', 'kurtosis'} массивов формы сетки.
+    """
+    names = {'m': 'mean', 'v': 'var', 's': 'skew', 'k': 'kurtosis'}
+    shape, flat = param_grid(**params)
+    values = dist.stats(moments=moments, **flat)
+    if len(moments) == 1:
+        values = (values,)
+    return {names[m]: np.asarray(v, dtype=float).reshape(shape) for m, v in zip(moments, values)}
+
+
+def first_crossing(values, coords, level, axis=-1):
+    """
+    Координата первого пересечения уровня level вдоль оси axis
+    (линейная интерполяция между узлами coords; NaN, если пересечения нет).
+    """
+    values = np.moveaxis(np.asarray(values, dtype=float), axis, -1)
+    coords = np.asarray(coords, dtype=float)
+    above = values >= level
+    change = above[..., 1:] != above[..., :-1]
+    found = change.any(axis=-1)
+    i = np.argmax(change, axis=-1)[..., None]
+    v0 = np.take_along_axis(values, i, axis=-1)[..., 0]
+    v1 = np.take_along_axis(values, i + 1, axis=-1)[..., 0]
+    c0, c1 = coords[i[..., 0]], coords[i[..., 0] + 1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t = np.where(v1 != v0, (level - v0) / (v1 - v0), 0.0)
+    return np.where(found, c0 + t * (c1 - c0), np.nan)
@@ -0,0 +1,155 @@
+from collections import namedtuple
+from functools import partial
+
+import numpy as np
+import pandas as pd
+from scipy.stats import qmc
+
+from geometric_engine import DEFAULT_CHUNK, classify_ring_zones
+
+# Способы генерации точек
+MODES = ('mc', 'sobol', 'halton', 'stratified', 'antithetic')
+
+# Мишень: classify(x, y) -> номер зоны, число зон, прямоугольник (x0, y0, x1, y1),
+# в котором равномерно бросаются точки
+Target = namedtuple('Target', ['classify', 'n_zones', 'box'])
+
+# Оценка вероятностей зон: среднее по репликам, стандартная ошибка,
+# фактическое число точек и число реплик
+Estimate = namedtuple('Estimate', ['p', 'se', 'n', 'replicates'])
+
+
+def ring_target(side, radii):
+    """Кольцевая мишень из topic1 в квадрате со стороной side."""
+    classify = partial(classify_ring_zones, side=side, radii=radii)
+    return Target(classify, len(radii) + 1, (0.0, 0.0, side, side))
+
+
+def _classify_polygon(x, y, vertices):
+    inside = np.zeros(np.shape(x), dtype=bool)
+    xj, yj = vertices[-1]
+    for xi, yi in vertices:
+        # Правило четности: пересечения горизонтального луча с ребром
+        crosses = (yi > y) != (yj > y)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            x_cross = (xj - xi) * (y - yi) / (yj - yi) + xi
+        inside ^= crosses & (x < x_cross)
+        xj, yj = xi, yi
+    return (~inside).astype(np.intp)
+
+
+def polygon_target(vertices, box=None):
+    """Многоугольник (зона 0 - внутри, 1 - снаружи); по умолчанию в описанном прямоугольнике."""
+    vertices = np.asarray(vertices, dtype=float)
+    if box is None:
+        box = (*vertices.min(axis=0), *vertices.max(axis=0))
+    return Target(partial(_classify_polygon, vertices=vertices), 2, tuple(map(float, box)))
+
+
+def _classify_circles(x, y, centers, radii):
+    inside = np.zeros(np.shape(x), dtype=bool)
+    for (cx, cy), r in zip(centers, radii):
+        inside |= (x - cx) ** 2 + (y - cy) ** 2 <= r * r
+    return (~inside).astype(np.intp)
+
+
+def circle_union_target(centers, radii, box=None):
+    """Объединение кругов (зона 0 - хотя бы в одном круге, 1 - снаружи)."""
+    centers = np.asarray(centers, dtype=float).reshape(-1, 2)
+    radii = np.asarray(radii, dtype=float).ravel()
+    if box is None:
+        box = (*(centers - radii[:, None]).min(axis=0), *(centers + radii[:, None]).max(axis=0))
+    return Target(partial(_classify_circles, centers=centers, radii=radii), 2,
+                  tuple(map(float, box)))
+
+
+def replicate_size(mode, n):
+    """Фактическое число точек в реплике: степень двойки для Соболя,
+    полный квадрат для стратификации, четное для антитетических пар."""
+    n = max(int(n), 1)
+    if mode == 'sobol':
+        return 1 << int(np.ceil(np.log2(n)))
+    if mode == 'stratified':
+        return max(int(np.sqrt(n)), 1) ** 2
+    if mode == 'antithetic':
+        return n + n % 2
+    return n
+
+
+def unit_points(mode, n, rng, chunk_size=DEFAULT_CHUNK):
+    """
+    Точки в единичном квадрате порциями (массивы (m, 2)) для одной реплики.
+    Число точек - replicate_size(mode, n).
+    """
+    if mode not in MODES:
+        raise ValueError(f"Неизвестный способ {mode!r}, доступны: {MODES}")
+    n = replicate_size(mode, n)
+    if mode == 'stratified':
+        # Решетка k x k, в каждой ячейке одна случайная точка
+        k = int(np.sqrt(n))
+        rows = max(1, chunk_size // k)
+        j = np.arange(k)
+        for start in range(0, k, rows):
+            i = np.arange(start, min(start + rows, k))
+            cells = np.stack(np.meshgrid(i, j, indexing='ij'), axis=-1).reshape(-1, 2)
+            yield (cells + rng.random(cells.shape)) / k
+        return
+    if mode == 'sobol':
+        engine = qmc.Sobol(d=2, scramble=True, seed=rng)
+        # Порции - степени двойки, чтобы не нарушать балансировку последовательности
+        chunk_size = 1 << int(np.log2(max(chunk_size, 1)))
+    elif mode == 'halton':
+        engine = qmc.Halton(d=2, scramble=True, seed=rng)
+    remaining = n
+    while remaining > 0:
+        m = min(chunk_size, remaining)
+        if mode in ('sobol', 'halton'):
+            yield engine.random(m)
+        elif mode == 'antithetic':
+            half = rng.random((m // 2, 2))
+            yield np.concatenate([half, 1.0 - half])
+        else:
+            yield rng.random((m, 2))
+        remaining -= m
+
+
+def estimate(target, n, mode='sobol', replicates=16, rng=None, chunk_size=DEFAULT_CHUNK):
+    """
+    Вероятности попадания в зоны мишени по n точкам (делятся на реплики).
+
+    Реплики независимы (свой скремблинг для QMC, свои сдвиги для стратификации),
+    поэтому стандартная ошибка оценивается по разбросу оценок реплик.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    x0, y0, x1, y1 = target.box
+    per_replicate = replicate_size(mode, n / replicates)
+    p = np.empty((replicates, target.n_zones))
+    for r in range(replicates):
+        counts = np.zeros(target.n_zones, dtype=np.int64)
+        for points in unit_points(mode, per_replicate, rng, chunk_size):
+            zone = target.classify(x0 + (x1 - x0) * points[:, 0], y0 + (y1 - y0) * points[:, 1])
+            counts += np.bincount(zone, minlength=target.n_zones)
+        p[r] = counts / per_replicate
+    se = p.std(axis=0, ddof=1) / np.sqrt(replicates) if replicates > 1 else np.full(target.n_zones, np.nan)
+    return Estimate(p.mean(axis=0), se, per_replicate * replicates, replicates)
+
+
+def convergence(target, sizes, modes=MODES, replicates=16, rng=None, exact=None):
+    """
+    Сравнение способов: ошибка в зависимости от числа точек.
+
+    Для каждого способа и объема - максимальная по зонам стандартная ошибка
+    и (если известны точные вероятности exact) максимальное отклонение.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    rows = []
+    for mode in modes:
+        for n in sizes:
+            est = estimate(target, n, mode, replicates, rng)
+            row = {'mode': mode, 'n': est.n, 'se': est.se.max()}
+            if exact is not None:
+                row['error'] = np.abs(est.p - np.asarray(exact)).max()
+            rows.append(row)
+    return pd.DataFrame(rows)
@@ -0,0 +1,247 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from parallel_engine import spawn_generators, split_tasks
+
+MANIFEST_NAME = 'manifest.json'
+STORE_VERSION = 2
+
+# Значений в одном файле-шарде (128 МБ float64) и в одной порции генерации/чтения
+DEFAULT_SHARD = 1 << 24
+DEFAULT_CHUNK = 1 << 20
+
+# Число интервалов гистограммы по умолчанию
+DEFAULT_BINS = 4096
+
+
+def describe(dist):
+    """Имя распределения и параметры (для манифеста) по объекту scipy или TabulatedSampler."""
+    frozen = getattr(dist, 'dist', dist)
+    name = getattr(frozen, 'name', type(frozen).__name__)
+    params = {'args': list(getattr(dist, 'args', ())), **getattr(dist, 'kwds', {})}
+    return name, json.loads(json.dumps(params, default=float))
+
+
+def fingerprint(dist):
+    """
+    Хэш содержимого распределения, которое не видно по имени и параметрам:
+    для TabulatedSampler - узлы и значения таблицы CDF и число шагов Ньютона
+    (меняются вместе с плотностью и tol). Для остальных - None.
+    """
+    if not callable(getattr(dist, 'table', None)):
+        return None
+    table = dist.table(*getattr(dist, 'args', ()))
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(table.x, dtype=np.float64).tobytes())
+    digest.update(np.ascontiguousarray(table.F, dtype=np.float64).tobytes())
+    digest.update(repr(getattr(dist, 'max_newton', None)).encode())
+    return digest.hexdigest()
+
+
+class FixedHistogram:
+    """
+    Гистограмма с фиксированными границами, пополняемая порциями.
+
+    Значения вне [edges[0], edges[-1]) считаются отдельно (under/over),
+    так что эмпирическая CDF в узлах edges точная, а квантили
+    определяются с точностью до ширины интервала. NaN считаются в nan
+    и в объем выборки (total) не входят.
+    """
+
+    def __init__(self, edges):
+        self.edges = np.asarray(edges, dtype=float)
+        self.counts = np.zeros(self.edges.size - 1, dtype=np.int64)
+        self.under = self.over = self.nan = 0
+        widths = np.diff(self.edges)
+        # Равные интервалы - номер интервала без поиска
+        self._uniform = np.allclose(widths, widths[0])
+
+    @classmethod
+    def uniform(cls, low, high, bins=DEFAULT_BINS):
+        return cls(np.linspace(low, high, bins + 1))
+
+    @property
+    def total(self):
+        return int(self.counts.sum()) + self.under + self.over
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        lo, hi, n_bins = self.edges[0], self.edges[-1], self.counts.size
+        if self._uniform:
+            idx = np.floor((values - lo) * (n_bins / (hi - lo)))
+            # Округление может вывести значение чуть меньше hi за последний интервал
+            idx = np.where(values < hi, np.minimum(idx, n_bins - 1), n_bins)
+        else:
+            idx = np.searchsorted(self.edges, values, side='right') - 1.0
+        nan = np.isnan(values)
+        under = idx < 0
+        over = (idx >= n_bins) & ~nan
+        self.nan += int(nan.sum())
+        self.under += int(under.sum())
+        self.over += int(over.sum())
+        inside = idx[~(under | over | nan)].astype(np.intp)
+        self.counts += np.bincount(inside, minlength=n_bins)
+        return self
+
+    def merge(self, other):
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Гистограммы с разными границами не объединяются")
+        self.counts += other.counts
+        self.under += other.under
+        self.over += other.over
+        self.nan += other.nan
+        return self
+
+    def density(self):
+        """Плотность по интервалам (нормировка на полный объем, включая выбросы)."""
+        return self.counts / (self.total * np.diff(self.edges))
+
+    def ecdf(self):
+        """Эмпирическая CDF в узлах edges: доля значений меньше edges[i]."""
+        cum = np.concatenate([[0], np.cumsum(self.counts)]) + self.under
+        return self.edges, cum / self.total
+
+    def cdf(self, x):
+        """Эмпирическая CDF (линейная интерполяция между узлами)."""
+        edges, F = self.ecdf()
+        return np.interp(x, edges, F)
+
+    def quantile(self, q):
+        """Квантили уровня q (NaN, если квантиль вне диапазона гистограммы)."""
+        edges, F = self.ecdf()
+        q = np.asarray(q, dtype=float)
+        result = np.interp(q, F, edges)
+        return np.where((q < F[0]) | (q > F[-1]), np.nan, result)[()]
+
+
+class SampleStore:
+    """
+    Выборка на диске: шарды .npy и манифест (распределение, параметры, seed,
+    объем, шарды). Данные читаются порциями из отображенных в память файлов,
+    поэтому гистограммы, CDF и квантили считаются без загрузки выборки целиком.
+    """
+
+    def __init__(self, path, manifest):
+        self.path = path
+        self.manifest = manifest
+
+    @property
+    def count(self):
+        return self.manifest['count']
+
+    def shards(self):
+        for shard in self.manifest['shards']:
+            yield np.load(os.path.join(self.path, shard['file']), mmap_mode='r')
+
+    def chunks(self, chunk_size=DEFAULT_CHUNK):
+        """Порции выборки (представления отображенных в память шардов)."""
+        for shard in self.shards():
+            for start in range(0, shard.size, chunk_size):
+                yield shard[start:start + chunk_size]
+
+    def histogram(self, bins=DEFAULT_BINS, range=None, chunk_size=DEFAULT_CHUNK):
+        """
+        Гистограмма за один проход по шардам. bins - число интервалов
+        (по умолчанию по [min, max] из манифеста) или массив границ.
+        """
+        if np.ndim(bins):
+            hist = FixedHistogram(bins)
+        else:
+            low, high = range or (self.manifest['min'], self.manifest['max'])
+            # Максимум попадает в последний интервал
+            hist = FixedHistogram.uniform(low, np.nextafter(high, np.inf), int(bins))
+        for chunk in self.chunks(chunk_size):
+            hist.update(chunk)
+        return hist
+
+
+def _load_manifest(path):
+    try:
+        with open(os.path.join(path, MANIFEST_NAME), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get('version') == STORE_VERSION else None
+
+
+def _write_manifest(path, manifest):
+    tmp_path = os.path.join(path, MANIFEST_NAME + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, os.path.join(path, MANIFEST_NAME))
+
+
+def write_samples(path, dist, count, seed, distribution=None, params=None,
+                  shard_size=DEFAULT_SHARD, chunk_size=DEFAULT_CHUNK):
+    """
+    Генерирует выборку объема count из dist (rvs(size=..., random_state=...))
+    в шарды по shard_size значений. Шард i генерируется своим дочерним потоком
+    seed, поэтому содержимое шарда не зависит от остальных. Манифест пишется
+    последним: неполная выборка без него считается отсутствующей.
+    """
+    name, described = describe(dist)
+    content = fingerprint(dist)
+    os.makedirs(path, exist_ok=True)
+    # Старая выборка перестает считаться действительной до записи нового манифеста
+    if os.path.exists(os.path.join(path, MANIFEST_NAME)):
+        os.remove(os.path.join(path, MANIFEST_NAME))
+    sizes = split_tasks(count, shard_size)
+    shards, low, high = [], np.inf, -np.inf
+    for i, (size, rng) in enumerate(zip(sizes, spawn_generators(seed, len(sizes)))):
+        file_name = f'shard_{i:05d}.npy'
+        tmp_path = os.path.join(path, file_name + '.tmp')
+        out = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float64, shape=(size,))
+        for start in range(0, size, chunk_size):
+            stop = min(start + chunk_size, size)
+            out[start:stop] = dist.rvs(size=stop - start, random_state=rng)
+            # NaN не задают диапазон (гистограмма считает их отдельно)
+            low = min(low, np.nanmin(out[start:stop], initial=np.inf))
+            high = max(high, np.nanmax(out[start:stop], initial=-np.inf))
+        out.flush()
+        del out
+        os.replace(tmp_path, os.path.join(path, file_name))
+        shards.append({'file': file_name, 'count': int(size)})
+    manifest = {
+        'version': STORE_VERSION,
+        'distribution': distribution or name,
+        'params': described if params is None else params,
+        'fingerprint': content,
+        'seed': seed,
+        'count': int(count),
+        'shard_size': int(shard_size),
+        'min': float(low),
+        'max': float(high),
+        'shards': shards,
+    }
+    _write_manifest(path, manifest)
+    # Шарды прежней, более длинной выборки
+    current = {shard['file'] for shard in shards}
+    for file_name in os.listdir(path):
+        if file_name.startswith('shard_') and file_name not in current:
+            os.remove(os.path.join(path, file_name))
+    return SampleStore(path, manifest)
+
+
+def open_samples(path, dist, count, seed, distribution=None, params=None,
+                 shard_size=DEFAULT_SHARD, chunk_size=DEFAULT_CHUNK):
+    """
+    Выборка из path, если ее манифест совпадает с запрошенной (распределение,
+    параметры, хэш содержимого, seed, объем, размер шарда); иначе она
+    генерируется заново.
+    """
+    name, described = describe(dist)
+    manifest = _load_manifest(path)
+    wanted = {
+        'distribution': distribution or name,
+        'params': described if params is None else params,
+        'fingerprint': fingerprint(dist),
+        'seed': seed,
+        'count': int(count),
+        'shard_size': int(shard_size),
+    }
+    if manifest is not None and all(manifest.get(k) == v for k, v in wanted.items()):
+        return SampleStore(path, manifest)
+    return write_samples(path, dist, count, seed, distribution, params, shard_size, chunk_size)
@@ -0,0 +1,106 @@
+import time
+from collections import namedtuple
+
+import numpy as np
+from scipy.stats import norm
+
+from streaming_moments import MomentAccumulator
+
+# Результат последовательного моделирования: оценки, границы доверительных
+# интервалов, затраченный объем выборки, достигнута ли точность, время (с)
+SequentialResult = namedtuple('SequentialResult',
+                              ['estimate', 'low', 'high', 'n', 'converged', 'elapsed'])
+
+DEFAULT_BATCH = 1 << 16
+# Во сколько раз может вырасти следующая порция относительно набранного объема
+MAX_GROWTH = 4
+
+
+def wilson_interval(successes, n, level=0.95):
+    """Доверительный интервал Уилсона для доли successes / n."""
+    z = norm.ppf(0.5 + level / 2)
+    successes = np.asarray(successes, dtype=float)
+    p = successes / n
+    denom = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return center - half, center + half
+
+
+def normal_interval(estimate, se, level=0.95):
+    """Нормальный доверительный интервал estimate ± z * se."""
+    z = norm.ppf(0.5 + level / 2)
+    estimate, se = np.asarray(estimate, dtype=float), np.asarray(se, dtype=float)
+    return estimate - z * se, estimate + z * se
+
+
+def _moment_summary(acc, level):
+    """Оценки E(X) и D(X) с нормальными интервалами (se дисперсии - через 4-й момент)."""
+    n = acc.n
+    var = acc.var
+    se_mean = np.sqrt(var / n)
+    se_var = np.sqrt(max(acc.m4 / n - var * var, 0.0) / n)
+    estimate = np.array([acc.mean, var])
+    low, high = normal_interval(estimate, [se_mean, se_var], level)
+    return estimate, low, high
+
+
+def _run(draw, merge, summarize, tol, batch_size, min_samples, max_samples, max_time, rng):
+    """
+    Общий цикл: порции добираются, пока все полуширины интервалов больше tol
+    и не исчерпан бюджет. Размер следующей порции - оценка недостающего объема
+    по текущей полуширине (она убывает как 1/sqrt(n)); при заданном max_time
+    она не больше объема, который успеет обработаться за оставшееся время
+    при наблюдаемой скорости.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    start = time.perf_counter()
+    state, n, m = None, 0, int(batch_size)
+    while True:
+        if max_samples is not None:
+            m = min(m, int(max_samples) - n)
+        part = draw(m, rng=rng)
+        state = part if state is None else merge(state, part)
+        n += m
+        estimate, low, high = summarize(state, n)
+        half = np.max((high - low) / 2)
+        converged = bool(half <= tol) and n >= min_samples
+        elapsed = time.perf_counter() - start
+        if (converged or (max_samples is not None and n >= max_samples)
+                or (max_time is not None and elapsed >= max_time)):
+            return SequentialResult(estimate, low, high, n, converged, elapsed)
+        if np.isfinite(half) and half > 0:
+            need = int(np.ceil(n * (half / tol) ** 2 * 1.05)) - n
+        else:
+            need = n
+        m = int(np.clip(need, batch_size, MAX_GROWTH * n))
+        if max_time is not None and elapsed > 0:
+            m = min(m, max(int((max_time - elapsed) * n / elapsed), 1))
+
+
+def sequential_proportions(draw, tol, level=0.95, batch_size=DEFAULT_BATCH, min_samples=0,
+                           max_samples=None, max_time=None, rng=None):
+    """
+    Последовательная оценка вероятностей по счетчикам исходов.
+
+    draw(m, rng=...) - число успехов (или массив счетчиков по зонам) в m
+    испытаниях, например partial(count_ring_zones, side, radii) или count_heads.
+    Интервалы Уилсона; остановка, когда все полуширины не больше tol или
+    исчерпан бюджет max_samples / max_time (секунды).
+    """
+    summarize = lambda counts, n: (np.asarray(counts) / n, *wilson_interval(counts, n, level))
+    return _run(draw, np.add, summarize, tol, batch_size, min_samples, max_samples, max_time, rng)
+
+
+def sequential_moments(draw, tol, level=0.95, batch_size=DEFAULT_BATCH, min_samples=1000,
+                       max_samples=None, max_time=None, rng=None):
+    """
+    Последовательная оценка E(X) и D(X) (в таком порядке) с нормальными интервалами.
+
+    draw(m, rng=...) - MomentAccumulator по m значениям, например
+    partial(sampled_moments, dist=frozen) из streaming_moments.
+    """
+    summarize = lambda acc, n: _moment_summary(acc, level)
+    return _run(draw, MomentAccumulator.__add__, summarize, tol, batch_size, min_samples,
+                max_samples, max_time, rng)
@@ -0,0 +1,200 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+# Общие для всех стратификаторов данные (передаются в процесс один раз)
+_shared = {}
+
+# Задач в обработке на один процесс (остальные ждут отправки)
+TASKS_PER_WORKER = 2
+
+# Столбцы результата scan_simpson
+RESULT_COLUMNS = ['stratifier', 'treatment_a', 'treatment_b', 'pooled_a', 'pooled_b',
+                  'pooled_diff', 'adjusted_diff', 'min_stratum_diff', 'max_stratum_diff',
+                  'n_strata', 'reversal', 'magnitude']
+
+
+def _codes(column):
+    """Целочисленные коды значений столбца (-1 - пропуск) и список значений."""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return column.cat.codes.to_numpy().astype(np.int32), column.cat.categories
+    if pd.api.types.is_integer_dtype(column.dtype) and len(column):
+        # Целые с малым диапазоном: код - сдвиг от минимума (без сортировки)
+        values = column.to_numpy()
+        low, high = int(values.min()), int(values.max())
+        if high - low < 1 << 16:
+            return (values - low).astype(np.int32), np.arange(low, high + 1)
+    codes, uniques = pd.factorize(column, sort=True)
+    return codes.astype(np.int32), uniques
+
+
+def _init_worker(df, keep, treat_codes, n_treat, successes, trials):
+    _shared.update(df=df, keep=keep, treat=treat_codes, n_treat=n_treat,
+                   successes=successes, trials=trials)
+    if trials is None:
+        # Бинарный исход входит в код ячейки: base = 2 * вариант + исход
+        base = treat_codes.astype(np.intp)
+        base <<= 1
+        base += successes
+        _shared['base'] = base
+
+
+def _stratum_table(strat_codes, n_strata):
+    """
+    Успехи и испытания по ячейкам (страта, вариант) - одна группировка
+    через bincount по объединенному коду. Возвращает два массива (n_strata, n_treat).
+    """
+    n_treat, trials = _shared['n_treat'], _shared['trials']
+    size = n_strata * n_treat
+    valid = strat_codes >= 0
+    if trials is None:
+        cell = np.multiply(strat_codes, 2 * n_treat, dtype=np.intp)
+        cell += _shared['base']
+        if not valid.all():
+            cell = cell[valid]
+        counts = np.bincount(cell, minlength=2 * size).reshape(n_strata, n_treat, 2)
+        return counts[..., 1], counts.sum(axis=-1)
+
+    successes = _shared['successes']
+    cell = np.multiply(strat_codes, n_treat, dtype=np.intp)
+    cell += _shared['treat']
+    if not valid.all():
+        cell, successes, trials = cell[valid], successes[valid], trials[valid]
+    successes = np.bincount(cell, weights=successes, minlength=size)
+    trials = np.bincount(cell, weights=trials, minlength=size)
+    return successes.reshape(n_strata, n_treat), trials.reshape(n_strata, n_treat)
+
+
+def _scan_one(name):
+    """Таблицы по стратификатору name; коды считаются здесь же (в процессе-исполнителе)."""
+    codes, values = _codes(_shared['df'][name])
+    return name, _stratum_table(codes[_shared['keep']], len(values))
+
+
+def _bounded_map(pool, fn, items, limit):
+    """Как pool.map, но в обработке не больше limit задач; результаты - в порядке items."""
+    items, end = iter(items), object()
+    pending, results, order = {}, {}, []
+    while True:
+        while len(pending) < limit:
+            item = next(items, end)
+            if item is end:
+                break
+            pending[pool.submit(fn, item)] = len(order)
+            order.append(item)
+        if not pending:
+            break
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            results[pending.pop(future)] = future.result()
+    return [results[i] for i in range(len(order))]
+
+
+def reversals(successes, trials, tol=0.0):
+    """
+    Парадокс Симпсона для всех пар вариантов по таблицам (страты x варианты).
+
+    Для пары (a, b) разворот есть, если разность долей успеха p_a - p_b
+    во всех стратах, где представлены оба варианта, одного знака,
+    а в объединенных данных - противоположного. Величина разворота -
+    min(|разность в объединенных данных|, min |разности в стратах|).
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rates = successes / trials
+        pooled = successes.sum(axis=0) / trials.sum(axis=0)
+
+    n_treat = trials.shape[1]
+    a, b = np.array(list(combinations(range(n_treat), 2)), dtype=int).reshape(-1, 2).T
+    diffs = rates[:, a] - rates[:, b]                     # (n_strata, n_pairs)
+    both = (trials[:, a] > 0) & (trials[:, b] > 0)
+    pooled_diff = pooled[a] - pooled[b]
+
+    weights = np.where(both, trials[:, a] + trials[:, b], 0)
+    safe = np.where(both, diffs, 0.0)
+    n_compared = both.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        adjusted = (safe * weights).sum(axis=0) / weights.sum(axis=0)
+    min_diff = np.where(both, diffs, np.inf).min(axis=0)
+    max_diff = np.where(both, diffs, -np.inf).max(axis=0)
+    min_abs = np.where(both, np.abs(diffs), np.inf).min(axis=0)
+
+    up = (min_diff > tol) & (pooled_diff < -tol)
+    down = (max_diff < -tol) & (pooled_diff > tol)
+    reversal = (up | down) & (n_compared > 0)
+    magnitude = np.where(reversal, np.minimum(np.abs(pooled_diff), min_abs), 0.0)
+    return {
+        'a': a, 'b': b,
+        'pooled_a': pooled[a], 'pooled_b': pooled[b],
+        'pooled_diff': pooled_diff,
+        'adjusted_diff': adjusted,
+        'min_stratum_diff': np.where(n_compared > 0, min_diff, np.nan),
+        'max_stratum_diff': np.where(n_compared > 0, max_diff, np.nan),
+        'n_strata': n_compared,
+        'reversal': reversal,
+        'magnitude': magnitude,
+    }
+
+
+def scan_simpson(df, treatment, outcome, stratifiers, total=None, workers=None,
+                 only_reversals=True, tol=0.0):
+    """
+    Поиск парадокса Симпсона по всем стратификаторам таблицы.
+
+    outcome - бинарный исход (0/1) для каждой строки или, если задан total,
+    число успехов в строке при total испытаниях (агрегированные данные).
+    Для каждого стратификатора все доли по стратам и вариантам получаются
+    одной группировкой; стратификаторы обрабатываются параллельно в процессах.
+    Коды стратификатора строятся в процессе, который его обрабатывает, и
+    только на время обработки, а в очереди пула не больше TASKS_PER_WORKER
+    задач на процесс, поэтому память не растет с числом стратификаторов.
+    Возвращает таблицу пар вариантов, отсортированную по величине разворота.
+    """
+    treat_codes, treat_values = _codes(df[treatment])
+    keep = treat_codes >= 0
+    if keep.all():
+        keep = slice(None)
+    if total is None:
+        successes = df[outcome].to_numpy()[keep]
+        if not np.isin(successes, (0, 1)).all():
+            raise ValueError(f"Исход {outcome!r} должен быть бинарным (0/1) или задайте total")
+        successes = successes.astype(np.int8)
+        trials = None
+    else:
+        successes = df[outcome].to_numpy(dtype=float)[keep]
+        trials = df[total].to_numpy(dtype=float)[keep]
+    # Фрейм передается процессам один раз (при fork - без копирования)
+    shared = (df, keep, treat_codes[keep], len(treat_values), successes, trials)
+
+    stratifiers = list(stratifiers)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(int(workers), len(stratifiers))
+    if workers <= 1:
+        _init_worker(*shared)
+        try:
+            tables = list(map(_scan_one, stratifiers))
+        finally:
+            _shared.clear()
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=shared) as pool:
+            tables = _bounded_map(pool, _scan_one, stratifiers, TASKS_PER_WORKER * workers)
+
+    frames = []
+    for name, (succ, tr) in tables:
+        res = reversals(succ, tr, tol)
+        a, b = res.pop('a'), res.pop('b')
+        frame = pd.DataFrame(res)
+        frame.insert(0, 'stratifier', name)
+        frame.insert(1, 'treatment_a', np.asarray(treat_values)[a])
+        frame.insert(2, 'treatment_b', np.asarray(treat_values)[b])
+        frames.append(frame)
+    if not frames:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+    result = pd.concat(frames, ignore_index=True)
+    if only_reversals:
+        result = result[result['reversal']]
+    return result.sort_values('magnitude', ascending=False, ignore_index=True)
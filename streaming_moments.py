@@ -0,0 +1,134 @@
+import numpy as np
+
+DEFAULT_CHUNK = 1 << 20
+
+
+class MomentAccumulator:
+    """
+    Потоковый накопитель моментов: n, среднее и центральные суммы M2-M4.
+
+    Порции данных добавляются через update (устойчивые формулы Уэлфорда/Чана
+    для объединения порции с накопленным), результаты параллельных
+    процессов объединяются через merge или оператор +, так что накопитель
+    подходит в качестве частичного результата parallel_engine.parallel_simulate.
+    """
+
+    def __init__(self, n=0, mean=0.0, m2=0.0, m3=0.0, m4=0.0):
+        self.n = int(n)
+        self.mean, self.m2, self.m3, self.m4 = float(mean), float(m2), float(m3), float(m4)
+
+    @classmethod
+    def from_array(cls, values):
+        """Моменты одной порции (два прохода по порции: среднее, затем степени отклонений)."""
+        values = np.asarray(values, dtype=float).ravel()
+        if values.size == 0:
+            return cls()
+        mean = values.mean()
+        c = values - mean
+        c2 = c * c
+        return cls(values.size, mean, c2.sum(), (c2 * c).sum(), (c2 * c2).sum())
+
+    def merge(self, other):
+        """Объединение с другим накопителем (формулы Пебэя для M2-M4)."""
+        na, nb = self.n, other.n
+        if nb == 0:
+            return self
+        if na == 0:
+            self.n, self.mean, self.m2, self.m3, self.m4 = (
+                other.n, other.mean, other.m2, other.m3, other.m4)
+            return self
+        n = na + nb
+        d = other.mean - self.mean
+        d_n = d / n
+        d2, d_n2 = d * d, d_n * d_n
+        m4 = (self.m4 + other.m4
+              + d2 * d_n2 * na * nb * (na * na - na * nb + nb * nb) / n
+              + 6 * d_n2 * (na * na * other.m2 + nb * nb * self.m2)
+              + 4 * d_n * (na * other.m3 - nb * self.m3))
+        m3 = (self.m3 + other.m3
+              + d * d_n2 * na * nb * (na - nb)
+              + 3 * d_n * (na * other.m2 - nb * self.m2))
+        self.m2 += other.m2 + d * d_n * na * nb
+        self.m3, self.m4 = m3, m4
+        self.mean += d_n * nb
+        self.n = n
+        return self
+
+    def update(self, values):
+        """Добавляет порцию значений."""
+        return self.merge(MomentAccumulator.from_array(values))
+
+    def __add__(self, other):
+        result = MomentAccumulator(self.n, self.mean, self.m2, self.m3, self.m4)
+        return result.merge(other)
+
+    @property
+    def var(self):
+        """Выборочная дисперсия со знаменателем n (как np.var)."""
+        return self.m2 / self.n if self.n else np.nan
+
+    @property
+    def std(self):
+        return np.sqrt(self.var)
+
+    @property
+    def skew(self):
+        return np.sqrt(self.n) * self.m3 / self.m2**1.5 if self.m2 else np.nan
+
+    @property
+    def kurtosis(self):
+        """Эксцесс (для нормального распределения равен 0)."""
+        return self.n * self.m4 / self.m2**2 - 3 if self.m2 else np.nan
+
+    def snapshot(self):
+        return {'n': self.n, 'mean': self.mean, 'var': self.var,
+                'skew': self.skew, 'kurtosis': self.kurtosis}
+
+    def __repr__(self):
+        return (f"MomentAccumulator(n={self.n}, mean={self.mean:.6g}, var={self.var:.6g}, "
+                f"skew={self.skew:.6g}, kurtosis={self.kurtosis:.6g})")
+
+
+def accumulate(chunks, checkpoints=(), on_checkpoint=None):
+    """
+    Накопление моментов по потоку порций с отчетами о сходимости.
+
+    После порции, на которой объем превысил очередную точку из checkpoints,
+    сохраняется (и передается в on_checkpoint) снимок характеристик.
+    Возвращает накопитель и список снимков.
+    """
+    acc = MomentAccumulator()
+    checkpoints = sorted(checkpoints)
+    history = []
+    next_idx = 0
+    for chunk in chunks:
+        acc.update(chunk)
+        if next_idx < len(checkpoints) and acc.n >= checkpoints[next_idx]:
+            while next_idx < len(checkpoints) and acc.n >= checkpoints[next_idx]:
+                next_idx += 1
+            history.append(acc.snapshot())
+            if on_checkpoint is not None:
+                on_checkpoint(history[-1])
+    return acc, history
+
+
+def sample_chunks(dist, n, rng, chunk_size=DEFAULT_CHUNK):
+    """Порции выборки объемом n из dist (любой объект с rvs(size=..., random_state=...))."""
+    remaining = int(n)
+    while remaining > 0:
+        m = min(chunk_size, remaining)
+        yield dist.rvs(size=m, random_state=rng)
+        remaining -= m
+
+
+def sampled_moments(n, rng, dist, chunk_size=DEFAULT_CHUNK):
+    """
+    Моменты выборки объема n из dist при постоянной памяти.
+
+    Сигнатура совместима с parallel_engine.parallel_simulate:
+    parallel_simulate(partial(sampled_moments, dist=frozen), n, seed=...).
+    """
+    acc = MomentAccumulator()
+    for chunk in sample_chunks(dist, n, rng, chunk_size):
+        acc.update(chunk)
+    return acc
@@ -0,0 +1,255 @@
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+# Узлы и веса Гаусса-Лежандра на [-1, 1] для интегрирования по ячейкам
+GL_NODES, GL_WEIGHTS = np.polynomial.legendre.leggauss(8)
+
+# Допустимое отличие интеграла плотности от 1 (больше - носитель найден неверно)
+NORM_TOL = 1e-3
+
+# Таблица CDF: узлы x, значения F и f в узлах, коэффициенты сплайна по ячейкам
+# (строка (c0, c1, c2, c3): F = c0 + c1 t + c2 t^2 + c3 t^3, t - доля ячейки),
+# оценка погрешности и нормировка
+CDFTable = namedtuple('CDFTable', ['x', 'F', 'f', 'coef', 'max_error', 'norm'])
+
+
+def _integrate_cells(pdf, left, right):
+    """Интеграл pdf по каждой ячейке [left, right] (векторно, Гаусс-Лежандр)."""
+    half = (right - left)[:, None] / 2
+    nodes = (left + right)[:, None] / 2 + half * GL_NODES
+    values = pdf(nodes.ravel()).reshape(nodes.shape)
+    return (values * GL_WEIGHTS).sum(axis=1) * half[:, 0]
+
+
+def build_cdf_table(pdf, a, b, tol=1e-10, n_init=64, max_nodes=1 << 18):
+    """
+    Таблица CDF для плотности pdf на отрезке [a, b] с контролем погрешности.
+
+    Между узлами CDF приближается кубическим сплайном Эрмита (F и F' = f
+    в узлах). Ячейка делится пополам, пока погрешность сплайна в ее середине
+    (по сравнению с квадратурой на половине ячейки) больше tol. Плотность
+    может быть ненормированной: таблица нормируется на полный интеграл.
+    """
+    x = np.linspace(a, b, n_init + 1)
+    while True:
+        left, right = x[:-1], x[1:]
+        mid = (left + right) / 2
+        first = _integrate_cells(pdf, left, mid)
+        second = _integrate_cells(pdf, mid, right)
+        f_edges = pdf(x)
+        # Значение сплайна Эрмита в середине ячейки: I/2 + h (f_l - f_r) / 8
+        spline_mid = (first + second) / 2 + (right - left) * (f_edges[:-1] - f_edges[1:]) / 8
+        error = np.abs(first - spline_mid)
+        bad = error > tol
+        if not bad.any() or x.size + bad.sum() > max_nodes:
+            break
+        x = np.sort(np.concatenate([x, mid[bad]]))
+
+    cells = first + second
+    norm = cells.sum()
+    F = np.concatenate([[0.0], np.cumsum(cells)]) / norm
+    F[-1] = 1.0
+    f = f_edges / norm
+    return CDFTable(x, F, f, _hermite_coefficients(x, F, f),
+                    float(error.max() / norm), float(norm))
+
+
+def _hermite_coefficients(x, F, f):
+    """
+    Коэффициенты кубического сплайна Эрмита по степеням t: массив (ячейки, 4),
+    строка ячейки читается одним обращением к памяти.
+    """
+    h = np.diff(x)
+    d0, d1 = h * f[:-1], h * f[1:]
+    dF = np.diff(F)
+    return np.stack([F[:-1], d0, 3 * dF - 2 * d0 - d1, d0 + d1 - 2 * dF], axis=1)
+
+
+def _horner(c0, c1, c2, c3, t):
+    """Значение сплайна и его производная по t."""
+    value = ((c3 * t + c2) * t + c1) * t + c0
+    slope = (3 * c3 * t + 2 * c2) * t + c1
+    return value, slope
+
+
+def _newton_step(t, residual, slope):
+    """Шаг Ньютона по t с удержанием внутри ячейки."""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        step = np.where(slope > 0, residual / slope, 0.0)
+    return np.clip(t - step, 0.0, 1.0)
+
+
+def _bisect(coef, q, tol, max_steps=64):
+    """
+    Бисекция по t внутри ячейки (сплайн CDF монотонен) - для точек, где шаги
+    Ньютона не сошлись (у нулей плотности сходимость Ньютона лишь линейная).
+    """
+    lo, hi = np.zeros(q.size), np.ones(q.size)
+    for _ in range(max_steps):
+        t = (lo + hi) / 2
+        value, _ = _horner(*coef.T, t)
+        below = value < q
+        lo, hi = np.where(below, t, lo), np.where(below, hi, t)
+        if np.all(np.abs(value - q) <= tol):
+            break
+    return (lo + hi) / 2
+
+
+def tail_bound(pdf, start, direction, tail, max_doublings=60):
+    """
+    Граница отсечения хвоста: шаг от start удваивается, пока оценка массы
+    хвоста pdf(x) * |x - start| не станет меньше tail.
+    """
+    width = 1.0
+    for _ in range(max_doublings):
+        x = start + direction * width
+        if pdf(np.array([x]))[0] * width < tail:
+            return x
+        width *= 2
+    raise ValueError("Не удалось найти границу хвоста распределения")
+
+
+def mass_center(pdf, a, b, min_power=-20, max_power=60, n_refine=64):
+    """
+    Грубая оценка положения массы плотности на (a, b): точка с наибольшей pdf
+    на сетке origin ± 2^j (origin - конечная граница носителя или 0),
+    уточненная равномерной сеткой между соседями лучшей точки.
+    """
+    origin = a if np.isfinite(a) else (b if np.isfinite(b) else 0.0)
+    offsets = 2.0 ** np.arange(min_power, max_power + 1)
+    grid = np.concatenate([origin - offsets[::-1], [origin], origin + offsets])
+    grid = grid[(grid >= a) & (grid <= b)]
+    values = np.nan_to_num(pdf(grid), nan=-1.0)
+    best = int(np.argmax(values))
+    fine = np.linspace(grid[max(best - 1, 0)], grid[min(best + 1, grid.size - 1)], n_refine)
+    fine_values = np.nan_to_num(pdf(fine), nan=-1.0)
+    if fine_values.max() > values[best]:
+        return float(fine[np.argmax(fine_values)])
+    return float(grid[best])
+
+
+def finite_support(dist, args=(), tail=1e-12, bounds=None):
+    """
+    Конечный отрезок интегрирования для распределения dist.
+
+    Бесконечный носитель обрезается там, где хвост пренебрежимо мал; поиск
+    идет наружу от области, где сосредоточена масса (mass_center), поэтому
+    годится и для плотностей, удаленных от нуля. bounds - явные границы.
+    """
+    a, b = map(float, bounds or dist.support(*args))
+    if np.isfinite(a) and np.isfinite(b):
+        return a, b
+    pdf = lambda x: dist.pdf(x, *args)
+    center = mass_center(pdf, a, b)
+    if not np.isfinite(a):
+        a = tail_bound(pdf, center, -1.0, tail)
+    if not np.isfinite(b):
+        b = tail_bound(pdf, center, 1.0, tail)
+    return a, b
+
+
+def check_norm(norm, dist, args=()):
+    """Ошибка, если интеграл плотности по найденному отрезку далек от 1."""
+    if not abs(norm - 1.0) <= NORM_TOL:
+        name = getattr(dist, 'name', type(dist).__name__)
+        raise ValueError(f"Интеграл плотности {name}{tuple(args)} по отрезку интегрирования "
+                         f"равен {norm:.6g}, а не 1: задайте bounds или нормируйте плотность")
+
+
+class TabulatedSampler:
+    """
+    Быстрые cdf/ppf/rvs для распределения, у которого задана только плотность.
+
+    Для каждого набора параметров один раз строится таблица CDF с
+    контролируемой погрешностью (build_cdf_table); cdf вычисляется
+    интерполяцией, ppf - поиском ячейки, шагами Ньютона по сплайну до
+    невязки tol (не больше max_newton) и бисекцией для несошедшихся точек
+    (max_newton=0 - только линейная интерполяция).
+    Таблицы хранятся в LRU-кэше на cache_size наборов параметров.
+    Бесконечный носитель обрезается по массе хвоста tail или по bounds.
+    """
+
+    def __init__(self, dist, tol=1e-10, max_newton=20, cache_size=32, tail=1e-12, bounds=None):
+        self.dist = dist
+        self.bounds = bounds
+        self.tol = tol
+        self.max_newton = max_newton
+        self.tail = tail
+        self.table = lru_cache(maxsize=cache_size)(self._build)
+
+    def _build(self, *args):
+        pdf = lambda x: self.dist.pdf(x, *args)
+        a, b = finite_support(self.dist, args, self.tail, self.bounds)
+        table = build_cdf_table(pdf, a, b, self.tol)
+        check_norm(table.norm, self.dist, args)
+        return table
+
+    def error(self, *args):
+        """
+        Оценка максимальной погрешности cdf и ppf: погрешность табличной CDF
+        плюс наибольшая невязка |cdf(ppf(q)) - q| на контрольных q (середины
+        ячеек по F и хвосты до 1e-12).
+        """
+        table = self.table(*args)
+        tails = np.geomspace(1e-12, 1e-2, 41)
+        q = np.clip(np.concatenate([(table.F[:-1] + table.F[1:]) / 2, tails, 1 - tails]), 0, 1)
+        inverse = np.abs(self.cdf(self.ppf(q, *args), *args) - q).max()
+        return table.max_error + float(inverse)
+
+    def cdf(self, x, *args):
+        table = self.table(*args)
+        x = np.asarray(x, dtype=float)
+        xc = np.clip(x, table.x[0], table.x[-1])
+        i = np.clip(np.searchsorted(table.x, xc, side='right') - 1, 0, table.x.size - 2)
+        t = (xc - table.x[i]) / (table.x[i + 1] - table.x[i])
+        value, _ = _horner(*np.take(table.coef, i, axis=0).T, t)
+        return np.clip(value, 0.0, 1.0)[()]
+
+    def ppf(self, q, *args):
+        table = self.table(*args)
+        q = np.asarray(q, dtype=float)
+        shape, q = q.shape, q.ravel()
+        i = np.clip(np.searchsorted(table.F, q, side='right') - 1, 0, table.x.size - 2)
+        # Коэффициенты каждой точки берутся из таблицы один раз
+        coef = np.take(table.coef, i, axis=0)
+        c0, c1, c2, c3 = coef.T
+        # Начальное приближение - линейная интерполяция CDF в ячейке
+        dF = c1 + c2 + c3
+        with np.errstate(invalid='ignore', divide='ignore'):
+            t = np.where(dF > 0, (q - c0) / dF, 0.0)
+        # Шаги Ньютона по сплайну: первые - по всему массиву, остальные - только
+        # для несошедшихся точек (у краев, где плотность близка к нулю)
+        n_full = min(self.max_newton, 1)
+        for _ in range(n_full):
+            value, slope = _horner(c0, c1, c2, c3, t)
+            t = _newton_step(t, value - q, slope)
+        # (коэффициенты и q несошедшихся точек сжимаются вместе с их номерами)
+        active, coef_active, q_active = np.arange(q.size), coef, q
+        for _ in range(self.max_newton - n_full):
+            value, slope = _horner(*coef_active.T, t[active])
+            residual = value - q_active
+            keep = np.abs(residual) > self.tol
+            active, coef_active, q_active = active[keep], coef_active[keep], q_active[keep]
+            if not active.size:
+                break
+            t[active] = _newton_step(t[active], residual[keep], slope[keep])
+        if self.max_newton and active.size:
+            # Точки, не сошедшиеся за max_newton шагов, уточняются бисекцией
+            value, _ = _horner(*coef_active.T, t[active])
+            keep = np.abs(value - q_active) > self.tol
+            if keep.any():
+                t[active[keep]] = _bisect(coef_active[keep], q_active[keep], self.tol)
+        x = table.x[i] + t * (table.x[i + 1] - table.x[i])
+        return np.where((q < 0) | (q > 1), np.nan, x).reshape(shape)[()]
+
+    def rvs(self, *args, size=1, random_state=None, chunk_size=1 << 22):
+        """Выборка методом обратной функции; генерируется порциями в готовый массив."""
+        rng = np.random.default_rng(random_state)
+        out = np.empty(size)
+        flat = out.reshape(-1)
+        for start in range(0, flat.size, chunk_size):
+            stop = min(start + chunk_size, flat.size)
+            flat[start:stop] = self.ppf(rng.random(stop - start), *args)
+        return out
@@ -1,54 +1,119 @@
-import numpy as np
-import matplotlib.pyplot as plt
-
-# 1. ПАРАМЕТРЫ И ТЕОРЕТИЧЕСКИЙ РАСЧЕТ
-side = 2.0
-area_total = side**2
-radii = [0.3, 0.7, 1.0] # Красный, Синий, Желтый
-colors = ['red', 'blue', 'yellow', 'gray']
-labels = ['Красный', 'Синий', 'Желтый', 'Белый']
-
-# Теоретические площади и вероятности
-areas_theory = [np.pi * radii[0]**2] # Первый круг
-areas_theory.append(np.pi * radii[1]**2 - np.pi * radii[0]**2) # Второе кольцо
-areas_theory.append(np.pi * radii[2]**2 - np.pi * radii[1]**2) # Третье кольцо
-areas_theory.append(area_total - np.pi * radii[2]**2)        # Остаток
-p_theory = [a / area_total for a in areas_theory]
-
-# 2. МОДЕЛИРОВАНИЕ МОНТЕ-КАРЛО
-n = 50000
-x = np.random.uniform(0, side, n)
-y = np.random.uniform(0, side, n)
-dist = np.sqrt((x - side/2)**2 + (y - side/2)**2)
-
-# Определение зон
-zones = [dist <= radii[0],
-         (dist > radii[0]) & (dist <= radii[1]),
-         (dist > radii[1]) & (dist <= radii[2]),
-         dist > radii[2]]
-p_sim = [np.sum(z) / n for z in zones]
-
-# 3. ВЫВОД РЕЗУЛЬТАТОВ В ТАБЛИЦУ
-print(f"{'Зона':<10} | {'Теория':<10} | {'Модель':<10} | {'Ошибка':<10}")
-print("-" * 50)
-for i in range(4):
-    print(f"{labels[i]:<10} | {p_theory[i]:.4f}     | {p_sim[i]:.4f}     | {abs(p_theory[i]-p_sim[i]):.6f}")
-
-# 4. ВИЗУАЛИЗАЦИЯ
-plt.figure(figsize=(10, 8))
-plt.gca().set_aspect('equal')
-
-# Отрисовка подмножества точек (2000 для скорости)
-for i, zone_mask in enumerate(zones):
-    plt.scatter(x[:2000][zone_mask[:2000]], y[:2000][zone_mask[:2000]],
-                c=colors[i], s=10, label=f"{labels[i]} ({p_sim[i]*100:.1f}%)")
-
-# Отрисовка контуров мишени
-for r in radii:
-    circle = plt.Circle((side/2, side/2), r, color='black', fill=False, linestyle='--')
-    plt.gca().add_patch(circle)
-
-plt.title(f'Моделирование геометрической вероятности (N={n})')
-plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
-plt.tight_layout()
-plt.show()
\ No newline at end of file
+import time
+from functools import partial
+
+from figures import show
+from instrumentation import count, stage
+
+
+def run(n=50000, seed=42, tol=1e-3, qmc_sizes=(10**3, 10**4, 10**5, 10**6), workers=None,
+        out_dir=None):
+    """Геометрическая вероятность: кольцевая мишень (Монте-Карло, QMC, последовательная оценка)."""
+    import numpy as np
+    import matplotlib.pyplot as plt
+
+    from geometric_engine import classify_ring_zones, count_ring_zones
+    from parallel_engine import make_generator, parallel_simulate
+    from qmc_estimator import MODES, convergence, estimate, ring_target
+    from sequential_mc import sequential_proportions
+
+    # 1. ПАРАМЕТРЫ И ТЕОРЕТИЧЕСКИЙ РАСЧЕТ
+    side = 2.0
+    area_total = side**2
+    radii = [0.3, 0.7, 1.0] # Красный, Синий, Желтый
+    colors = ['red', 'blue', 'yellow', 'gray']
+    labels = ['Красный', 'Синий', 'Желтый', 'Белый']
+
+    # Теоретические площади и вероятности
+    areas_theory = [np.pi * radii[0]**2] # Первый круг
+    areas_theory.append(np.pi * radii[1]**2 - np.pi * radii[0]**2) # Второе кольцо
+    areas_theory.append(np.pi * radii[2]**2 - np.pi * radii[1]**2) # Третье кольцо
+    areas_theory.append(area_total - np.pi * radii[2]**2)        # Остаток
+    p_theory = [a / area_total for a in areas_theory]
+
+    # 2. МОДЕЛИРОВАНИЕ МОНТЕ-КАРЛО
+    # Точки обрабатываются порциями: память не зависит от n, копятся только счетчики зон.
+    # Большие n делятся на задачи с независимыми потоками и считаются на всех ядрах,
+    # итоговые счетчики при одном seed не зависят от числа процессов.
+    t_start = time.perf_counter()
+    with stage('topic1.simulate'):
+        zone_counts = parallel_simulate(partial(count_ring_zones, side, radii), n, seed=seed,
+                                        workers=workers)
+    count('topic1.points', n)
+    elapsed = time.perf_counter() - t_start
+    p_sim = zone_counts / n
+
+    # 3. ВЫВОД РЕЗУЛЬТАТОВ В ТАБЛИЦУ
+    print(f"{'Зона':<10} | {'Теория':<10} | {'Модель':<10} | {'Ошибка':<10}")
+    print("-" * 50)
+    for i in range(4):
+        print(f"{labels[i]:<10} | {p_theory[i]:.4f}     | {p_sim[i]:.4f}     | {abs(p_theory[i]-p_sim[i]):.6f}")
+    print(f"\nСкорость моделирования: {n / max(elapsed, 1e-12):,.0f} точек/с")
+
+    # Последовательная оценка: точки добираются порциями, пока полуширина
+    # 95%-ных интервалов Уилсона для всех зон не станет меньше tol
+    with stage('topic1.sequential'):
+        seq = sequential_proportions(partial(count_ring_zones, side, radii), tol,
+                                     max_time=60, rng=make_generator(seed))
+    count('topic1.points', seq.n)
+    print(f"До точности ±{tol} потребовалось N = {seq.n:,} точек:")
+    for i in range(len(labels)):
+        print(f"  {labels[i]:<10} {seq.estimate[i]:.4f}  [{seq.low[i]:.4f}, {seq.high[i]:.4f}]")
+
+    # 4. ВИЗУАЛИЗАЦИЯ
+    plt.figure(figsize=(10, 8))
+    plt.gca().set_aspect('equal')
+
+    # Отрисовка подмножества точек (2000 для скорости)
+    rng = make_generator(seed)
+    x = rng.uniform(0, side, 2000)
+    y = rng.uniform(0, side, 2000)
+    zone_ids = classify_ring_zones(x, y, side, radii)
+    for i in range(len(labels)):
+        zone_mask = zone_ids == i
+        plt.scatter(x[zone_mask], y[zone_mask],
+                    c=colors[i], s=10, label=f"{labels[i]} ({p_sim[i]*100:.1f}%)")
+
+    # Отрисовка контуров мишени
+    for r in radii:
+        circle = plt.Circle((side/2, side/2), r, color='black', fill=False, linestyle='--')
+        plt.gca().add_patch(circle)
+
+    plt.title(f'Моделирование геометрической вероятности (N={n})')
+    plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
+    plt.tight_layout()
+    show('zones', out_dir)
+
+    # 5. КВАЗИ-МОНТЕ-КАРЛО И СНИЖЕНИЕ ДИСПЕРСИИ
+    # Те же вероятности по скремблированным последовательностям Соболя/Холтона,
+    # стратифицированной решетке и антитетическим парам. Ошибка оценивается
+    # по разбросу независимых реплик (16 реплик на каждый объем).
+    target = ring_target(side, radii)
+    with stage('topic1.qmc_estimate'):
+        qmc_est = estimate(target, n, mode='sobol', rng=make_generator(seed))
+    count('topic1.points', qmc_est.n)
+    print(f"\nСоболь, N={qmc_est.n}: " + ", ".join(
+        f"{labels[i]} {qmc_est.p[i]:.5f} ± {qmc_est.se[i]:.5f}" for i in range(len(labels))))
+
+    sizes = list(qmc_sizes)
+    with stage('topic1.qmc_convergence'):
+        table = convergence(target, sizes, rng=make_generator(seed), exact=p_theory)
+    count('topic1.points', int(table['n'].sum()))
+    print(table.to_string(index=False, float_format='{:.2e}'.format))
+
+    # Ошибка в зависимости от N для всех способов (мишень центрально-симметрична,
+    # поэтому антитетические пары здесь не уменьшают дисперсию)
+    plt.figure(figsize=(9, 6))
+    for mode in MODES:
+        rows = table[table['mode'] == mode]
+        plt.loglog(rows['n'], rows['se'], 'o-', label=mode)
+    plt.loglog(sizes, [0.5 / np.sqrt(k) for k in sizes], 'k:', label='$\\sim 1/\\sqrt{N}$')
+    plt.xlabel('N')
+    plt.ylabel('Стандартная ошибка (макс. по зонам)')
+    plt.title('Сходимость оценок вероятностей зон')
+    plt.legend()
+    plt.grid(True, which='both', alpha=0.3)
+    show('qmc_convergence', out_dir)
+
+
+if __name__ == '__main__':
+    run()
@@ -1,70 +1,117 @@
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
+from figures import show
+from instrumentation import count, stage
 
-# === ПАРАМЕТРЫ ЭКСПЕРИМЕНТА ===
-np.random.seed(42)  # Для воспроизводимости результатов
-total_trials = 2000  # Общее число бросков монеты
-# Моделируем броски: 1 - Орел (Успех), 0 - Решка
-tosses = np.random.choice([0, 1], size=total_trials)
 
-# === ВЫЧИСЛЕНИЕ ЧАСТОТНОЙ ВЕРОЯТНОСТИ ===
-# Кумулятивная сумма орлов (1) нарастающим итогом
-cumulative_heads = np.cumsum(tosses)
-# Номера испытаний: 1, 2, 3, ..., total_trials
-trial_numbers = np.arange(1, total_trials + 1)
-# Относительная частота (Частотная вероятность) выпадения Орла
-frequency_probability = cumulative_heads / trial_numbers
+def run(total_trials=2000, n_paths=1000, seed=42, tol=1e-3, out_dir=None):
+    """Закон больших чисел: сходимость частоты выпадения орла к 1/2."""
+    import numpy as np
+    import matplotlib.pyplot as plt
 
-# === КЛАССИЧЕСКАЯ (ТЕОРЕТИЧЕСКАЯ) ВЕРОЯТНОСТЬ ===
-# Для правильной монеты: P(Орел) = 1/2 = 0.5
-theoretical_prob = 0.5
+    from coin_engine import count_heads, frequency_chunks, path_checkpoints
+    from decimation import decimate_stream
+    from parallel_engine import make_generator
+    from sequential_mc import sequential_proportions
 
-# === ВИЗУАЛИЗАЦИЯ ===
-plt.figure(figsize=(14, 7))
+    # === ПАРАМЕТРЫ ЭКСПЕРИМЕНТА ===
+    # Для воспроизводимости: независимые потоки для показанного пути,
+    # для множества путей и для последовательной оценки
+    path_seed, paths_seed, seq_seed = np.random.SeedSequence(seed).spawn(3)
+    # Моделируем броски: 1 - Орел (Успех), 0 - Решка
+    # Каждое 64-битное слово генератора дает 64 броска. Относительная частота
+    # выпадения Орла считается порциями (без массива бросков) и сразу
+    # прореживается для графика (min/max по столбцам пикселей)
+    last_frequency = []
 
-# График сходимости частотной вероятности к классической
-plt.subplot(1, 2, 1)  # Создаем первую ячейку для графика (1 строка, 2 столбца, ячейка 1)
-plt.plot(trial_numbers, frequency_probability,
-         color='blue', alpha=0.7, linewidth=0.8, label='Частотная вероятность P(Орел)')
-plt.axhline(y=theoretical_prob, color='red', linestyle='--',
-            linewidth=2, label=f'Классическая вероятность = {theoretical_prob}')
-plt.title('Стремление частотной вероятности к классической\n(Бросок монеты)', fontsize=14)
-plt.xlabel('Число испытаний (бросков)', fontsize=12)
-plt.ylabel('Вероятность / Частота', fontsize=12)
-plt.legend(loc='upper right')
-plt.grid(True, alpha=0.3)
-plt.ylim([0.3, 0.7])  # Фиксируем масштаб по оси Y для наглядности
+    def path_chunks():
+        for frequency in frequency_chunks(total_trials, make_generator(path_seed)):
+            last_frequency[:] = frequency[-1:]
+            yield frequency
 
-# Гистограмма распределения исходов (для наглядности всего эксперимента)
-plt.subplot(1, 2, 2)  # Вторая ячейка для графика
-final_counts = np.bincount(tosses)  # Считаем итоговое количество Орлов и Решек
-labels = ['Решка (0)', 'Орел (1)']
-colors = ['gray', 'gold']
-bars = plt.bar(labels, final_counts, color=colors, edgecolor='black')
-plt.title(f'Распределение исходов после {total_trials} бросков', fontsize=14)
-plt.ylabel('Количество', fontsize=12)
-# Подписываем значения на столбцах
-for bar, count in zip(bars, final_counts):
-    height = bar.get_height()
-    plt.text(bar.get_x() + bar.get_width()/2., height + 5,
-             f'{count}\n({count/total_trials*100:.1f}%)',
-             ha='center', va='bottom')
-plt.ylim([0, max(final_counts) * 1.2])
+    with stage('topic2.generate'):
+        path_x, path_y = decimate_stream(path_chunks(), total_trials)
+    count('topic2.tosses', total_trials)
+    # Итоговое число орлов - по последней частоте того же прохода
+    heads = int(round(last_frequency[0] * total_trials))
 
-plt.tight_layout()  # Автоматическая подгонка отступов между графиками
-plt.show()
+    # === КЛАССИЧЕСКАЯ (ТЕОРЕТИЧЕСКАЯ) ВЕРОЯТНОСТЬ ===
+    # Для правильной монеты: P(Орел) = 1/2 = 0.5
+    theoretical_prob = 0.5
 
-# === ВЫВОД РЕЗУЛЬТАТОВ ===
-print("="*60)
-print("ЭКСПЕРИМЕНТ: БРОСОК МОНЕТЫ")
-print("="*60)
-print(f"Общее число испытаний (бросков): N = {total_trials}")
-print(f"Количество выпавших 'Орлов' (успехов): k = {cumulative_heads[-1]}")
-print(f"Частотная вероятность P*(Орел) = k/N = {frequency_probability[-1]:.4f}")
-print(f"Классическая (теоретическая) вероятность P(Орел) = {theoretical_prob:.4f}")
-print(f"Абсолютная разница: |P* - P| = {abs(frequency_probability[-1] - theoretical_prob):.4f}")
-print("-"*60)
-print("ВЫВОД: При увеличении числа испытаний (N → ∞) частота события")
-print("       стабилизируется и приближается к его классической вероятности.")
-print("="*60)
\ No newline at end of file
+    # === РАЗБРОС ЧАСТОТЫ ПО МНОГИМ ПУТЯМ ===
+    # Все пути моделируются блоками по словам генератора; частоты запоминаются
+    # только в ~500 логарифмически расположенных точках, так что память
+    # не зависит от total_trials
+    checkpoints = np.unique(np.append(np.geomspace(1, total_trials, 500).astype(np.int64),
+                                      total_trials))
+    with stage('topic2.paths'):
+        paths_heads = path_checkpoints(n_paths, make_generator(paths_seed), total_trials,
+                                       checkpoints)
+    count('topic2.tosses', n_paths * total_trials)
+    paths_frequency = paths_heads / checkpoints
+    band_low, band_high = np.quantile(paths_frequency, [0.05, 0.95], axis=0)
+    spread_final = paths_frequency[:, -1].std()
+    spread_theory = np.sqrt(theoretical_prob * (1 - theoretical_prob) / total_trials)
+
+    # === ВИЗУАЛИЗАЦИЯ ===
+    plt.figure(figsize=(14, 7))
+
+    # График сходимости частотной вероятности к классической
+    plt.subplot(1, 2, 1)  # Создаем первую ячейку для графика (1 строка, 2 столбца, ячейка 1)
+    # На график идут прореженный путь и полоса в контрольных точках, поэтому
+    # число вершин и время отрисовки не зависят от total_trials
+    plt.plot(path_x, path_y,
+             color='blue', alpha=0.7, linewidth=0.8, label='Частотная вероятность P(Орел)')
+    plt.fill_between(checkpoints, band_low, band_high, color='blue', alpha=0.15,
+                     label=f'5-95% по {n_paths} путям')
+    plt.axhline(y=theoretical_prob, color='red', linestyle='--',
+                linewidth=2, label=f'Классическая вероятность = {theoretical_prob}')
+    plt.title('Стремление частотной вероятности к классической\n(Бросок монеты)', fontsize=14)
+    plt.xlabel('Число испытаний (бросков)', fontsize=12)
+    plt.ylabel('Вероятность / Частота', fontsize=12)
+    plt.legend(loc='upper right')
+    plt.grid(True, alpha=0.3)
+    plt.ylim([0.3, 0.7])  # Фиксируем масштаб по оси Y для наглядности
+
+    # Гистограмма распределения исходов (для наглядности всего эксперимента)
+    plt.subplot(1, 2, 2)  # Вторая ячейка для графика
+    final_counts = [total_trials - heads, heads]  # Итоговое количество Решек и Орлов
+    labels = ['Решка (0)', 'Орел (1)']
+    colors = ['gray', 'gold']
+    bars = plt.bar(labels, final_counts, color=colors, edgecolor='black')
+    plt.title(f'Распределение исходов после {total_trials} бросков', fontsize=14)
+    plt.ylabel('Количество', fontsize=12)
+    # Подписываем значения на столбцах
+    for bar, outcome_count in zip(bars, final_counts):
+        height = bar.get_height()
+        plt.text(bar.get_x() + bar.get_width()/2., height + 5,
+                 f'{outcome_count}\n({outcome_count/total_trials*100:.1f}%)',
+                 ha='center', va='bottom')
+    plt.ylim([0, max(final_counts) * 1.2])
+
+    plt.tight_layout()  # Автоматическая подгонка отступов между графиками
+    show('frequency', out_dir)
+
+    # === ВЫВОД РЕЗУЛЬТАТОВ ===
+    print("="*60)
+    print("ЭКСПЕРИМЕНТ: БРОСОК МОНЕТЫ")
+    print("="*60)
+    print(f"Общее число испытаний (бросков): N = {total_trials}")
+    print(f"Количество выпавших 'Орлов' (успехов): k = {heads}")
+    print(f"Частотная вероятность P*(Орел) = k/N = {heads / total_trials:.4f}")
+    print(f"Классическая (теоретическая) вероятность P(Орел) = {theoretical_prob:.4f}")
+    print(f"Абсолютная разница: |P* - P| = {abs(heads / total_trials - theoretical_prob):.4f}")
+    print(f"Разброс P* по {n_paths} путям (СКО): {spread_final:.4f}, теория sqrt(p(1-p)/N) = {spread_theory:.4f}")
+    # Сколько бросков нужно, чтобы 95%-ный интервал Уилсона для P(Орел) был уже ±tol
+    with stage('topic2.sequential'):
+        seq = sequential_proportions(count_heads, tol, rng=make_generator(seq_seed))
+    count('topic2.tosses', seq.n)
+    print(f"Последовательная оценка до ±{tol}: P* = {seq.estimate:.4f} "
+          f"[{seq.low:.4f}, {seq.high:.4f}] за N = {seq.n:,} бросков")
+    print("-"*60)
+    print("ВЫВОД: При увеличении числа испытаний (N → ∞) частота события")
+    print("       стабилизируется и приближается к его классической вероятности.")
+    print("="*60)
+
+
+if __name__ == '__main__':
+    run()
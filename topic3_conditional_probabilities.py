@@ -1,110 +1,148 @@
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-
-# === 1. ЗАГРУЗКА И ОПИСАНИЕ ДАННЫХ ===
-# Используем набор данных Adult Census (Данные переписи населения)
-url = "https://raw.githubusercontent.com/jbrownlee/Datasets/master/adult-all.csv"
-columns = ['age', 'workclass', 'fnlwgt', 'education', 'education_num', 'marital_status', 
-           'occupation', 'relationship', 'race', 'sex', 'capital_gain', 'capital_loss', 
-           'hours_per_week', 'native_country', 'income']
-df = pd.read_csv(url, names=columns, na_values='?', skipinitialspace=True)
-
-# Целевое событие A: Доход >50K
-df['is_rich'] = (df['income'] == '>50K').astype(int)
-
-print("--- Описание признаков ---")
-print(f"Общее количество записей: {df.shape[0]}")
-print(f"Признаки для анализа: 'sex' (Пол), 'education' (Образование)")
-print(f"Целевое событие: доход >50K в год\n")
-
-# === 2. РАСЧЕТ УСЛОВНЫХ ВЕРОЯТНОСТЕЙ (Аналог crosstab из примера) ===
-
-# Создаем таблицу сопряженности для пола и дохода
-sex_crosstab = pd.crosstab(df['sex'], df['income'], normalize='index')
-
-# Создаем таблицу сопряженности для образования и дохода
-# Ограничимся основными категориями для чистоты графика
-edu_filter = df[df['education'].isin(['Bachelors', 'HS-grad', 'Masters', 'Doctorate', 'Some-college'])]
-edu_crosstab = pd.crosstab(edu_filter['education'], edu_filter['income'], normalize='index')
-
-# === 3. ВИЗУАЛИЗАЦИЯ (Как в предоставленном файле) ===
-
-plt.figure(figsize=(16, 6))
-
-# Левый график: Влияние пола
-plt.subplot(1, 2, 1)
-sns.heatmap(sex_crosstab, annot=True, cmap="YlGnBu", cbar=False)
-plt.title('P(Income | Sex)\nУсловная вероятность дохода в зависимости от пола')
-plt.ylabel('Пол')
-plt.xlabel('Уровень дохода')
-
-# Правый график: Влияние образования
-plt.subplot(1, 2, 2)
-# Визуализация через накопительную столбчатую диаграмму (как часто делают в анализе данных)
-edu_crosstab.plot(kind='barh', stacked=True, ax=plt.gca(), color=['#f99191', '#91f991'])
-plt.title('P(Income | Education)\nСоотношение доходов по уровням образования')
-plt.legend(title='Доход', loc='lower right')
-plt.xlabel('Доля (Вероятность)')
-plt.ylabel('Образование')
-
-plt.tight_layout()
-plt.show()
-
-# === 4. ТЕОРЕТИКО-ВЕРОЯТНОСТНЫЙ АНАЛИЗ ===
-p_A = df['is_rich'].mean()  # Априорная вероятность
-
-# Апостериорные вероятности (уточненные после получения данных)
-p_A_cond_male = sex_crosstab.loc['Male', '>50K']
-p_A_cond_female = sex_crosstab.loc['Female', '>50K']
-p_A_cond_doctorate = edu_crosstab.loc['Doctorate', '>50K']
-
-print("="*65)
-print("АНАЛИЗ АПРИОРНЫХ И АПОСТЕРИОРНЫХ ВЕРОЯТНОСТЕЙ")
-print("="*65)
-print(f"АПРИОРНАЯ ВЕРОЯТНОСТЬ P(A): {p_A:.4f}")
-print(" (Вероятность высокого дохода без учета доп. факторов)")
-print("-" * 65)
-print(f"АПОСТЕРИОРНАЯ ВЕРОЯТНОСТЬ P(A | Male):      {p_A_cond_male:.4f}")
-print(f"АПОСТЕРИОРНАЯ ВЕРОЯТНОСТЬ P(A | Female):    {p_A_cond_female:.4f}")
-print(f"АПОСТЕРИОРНАЯ ВЕРОЯТНОСТЬ P(A | Doctorate): {p_A_cond_doctorate:.4f}")
-print("-" * 65)
-
-# Проверка на независимость (как в примерах из Drive)
-print("ВЫВОД:")
-if abs(p_A - p_A_cond_male) > 0.05:
-    print("События зависимы: априорная вероятность P(A) значительно отличается")
-    print("от апостериорной P(A|B). Данный признак является информативным.")
-else:
-    print("События практически независимы.")
-print("="*65)
-# === 5. РАСЧЕТ ПО ФОРМУЛЕ БАЙЕСА ===
-
-# 1. Априорная вероятность высокого дохода P(A)
-p_high_income = df['is_rich'].mean()
-
-# 2. Априорная вероятность, что человек - женщина P(B)
-p_female = (df['sex'] == 'Female').mean()
-
-# 3. Условная вероятность (правдоподобие) P(A|B): доход >50K, если это женщина
-p_high_income_given_female = sex_crosstab.loc['Female', '>50K']
-
-# 4. Формула Байеса: P(B|A) = (P(A|B) * P(B)) / P(A)
-# Вероятность того, что человек женщина, при условии, что доход >50K
-p_female_given_high_income = (p_high_income_given_female * p_female) / p_high_income
-
-print("="*65)
-print("РАСЧЕТ ОБРАТНОЙ ВЕРОЯТНОСТИ ПО ТЕОРЕМЕ БАЙЕСА")
-print("="*65)
-print(f"1. Вероятность высокого дохода P(High Income): {p_high_income:.4f}")
-print(f"2. Вероятность встретить женщину P(Female): {p_female:.4f}")
-print(f"3. Вероятность, что женщина богата P(High Income | Female): {p_high_income_given_female:.4f}")
-print("-" * 65)
-print(f"РЕЗУЛЬТАТ (Байес):")
-print(f"Вероятность P(Female | High Income) = {p_female_given_high_income:.4f}")
-print("-" * 65)
-print("ИНТЕРПРЕТАЦИЯ:")
-print(f"Хотя среди женщин только {p_high_income_given_female*100:.1f}% имеют высокий доход,")
-print(f"среди всех богатых людей женщины составляют {p_female_given_high_income*100:.1f}%.")
-print("="*65)
+from figures import show
+from instrumentation import count, stage
+
+
+def run(csv_path=None, download=False, n_replicates=10000, seed=42, out_dir=None):
+    """Условные вероятности и формула Байеса на данных Adult Census."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    from census_data import load_adult
+    from count_bootstrap import probability_intervals
+    from count_cube import CountCube
+    from parallel_engine import make_generator
+
+    # === 1. ЗАГРУЗКА И ОПИСАНИЕ ДАННЫХ ===
+    # Используем набор данных Adult Census (Данные переписи населения)
+    # CSV читается из локального файла (data/adult-all.csv или переменная ADULT_CSV)
+    # и кэшируется по столбцам; повторные запуски отображают кэш в память.
+    # Если файла нет, он скачивается только при download=True (--set topic3.download=True).
+    with stage('topic3.load'):
+        df = load_adult(csv_path, download=download)
+    count('topic3.rows', len(df))
+
+    # Целевое событие A: Доход >50K
+    event_A = {'income': '>50K'}
+
+    # Куб частот по признакам строится за один проход по данным;
+    # все вероятности ниже считаются по его счетчикам без повторного сканирования
+    with stage('topic3.cube'):
+        cube = CountCube.from_frame(df, ['sex', 'education', 'income'])
+
+    print("--- Описание признаков ---")
+    print(f"Общее количество записей: {df.shape[0]}")
+    print(f"Признаки для анализа: 'sex' (Пол), 'education' (Образование)")
+    print(f"Целевое событие: доход >50K в год\n")
+
+    # === 2. РАСЧЕТ УСЛОВНЫХ ВЕРОЯТНОСТЕЙ (Аналог crosstab из примера) ===
+
+    # Создаем таблицу сопряженности для пола и дохода
+    sex_crosstab = cube.conditional_table('sex', 'income')
+
+    # Создаем таблицу сопряженности для образования и дохода
+    # Ограничимся основными категориями для чистоты графика
+    edu_filter = ['Bachelors', 'HS-grad', 'Masters', 'Doctorate', 'Some-college']
+    edu_crosstab = cube.conditional_table('education', 'income', rows=edu_filter)
+
+    # === 3. ВИЗУАЛИЗАЦИЯ (Как в предоставленном файле) ===
+
+    plt.figure(figsize=(16, 6))
+
+    # Левый график: Влияние пола
+    plt.subplot(1, 2, 1)
+    sns.heatmap(sex_crosstab, annot=True, cmap="YlGnBu", cbar=False)
+    plt.title('P(Income | Sex)\nУсловная вероятность дохода в зависимости от пола')
+    plt.ylabel('Пол')
+    plt.xlabel('Уровень дохода')
+
+    # Правый график: Влияние образования
+    plt.subplot(1, 2, 2)
+    # Визуализация через накопительную столбчатую диаграмму (как часто делают в анализе данных)
+    edu_crosstab.plot(kind='barh', stacked=True, ax=plt.gca(), color=['#f99191', '#91f991'])
+    plt.title('P(Income | Education)\nСоотношение доходов по уровням образования')
+    plt.legend(title='Доход', loc='lower right')
+    plt.xlabel('Доля (Вероятность)')
+    plt.ylabel('Образование')
+
+    plt.tight_layout()
+    show('conditional', out_dir)
+
+    # === 4. ТЕОРЕТИКО-ВЕРОЯТНОСТНЫЙ АНАЛИЗ ===
+    p_A = cube.probability(event_A)  # Априорная вероятность
+
+    # Апостериорные вероятности (уточненные после получения данных)
+    p_A_cond_male = sex_crosstab.loc['Male', '>50K']
+    p_A_cond_female = sex_crosstab.loc['Female', '>50K']
+    p_A_cond_doctorate = edu_crosstab.loc['Doctorate', '>50K']
+
+    print("="*65)
+    print("АНАЛИЗ АПРИОРНЫХ И АПОСТЕРИОРНЫХ ВЕРОЯТНОСТЕЙ")
+    print("="*65)
+    print(f"АПРИОРНАЯ ВЕРОЯТНОСТЬ P(A): {p_A:.4f}")
+    print(" (Вероятность высокого дохода без учета доп. факторов)")
+    print("-" * 65)
+    print(f"АПОСТЕРИОРНАЯ ВЕРОЯТНОСТЬ P(A | Male):      {p_A_cond_male:.4f}")
+    print(f"АПОСТЕРИОРНАЯ ВЕРОЯТНОСТЬ P(A | Female):    {p_A_cond_female:.4f}")
+    print(f"АПОСТЕРИОРНАЯ ВЕРОЯТНОСТЬ P(A | Doctorate): {p_A_cond_doctorate:.4f}")
+    print("-" * 65)
+
+    # Проверка на независимость (как в примерах из Drive)
+    print("ВЫВОД:")
+    if abs(p_A - p_A_cond_male) > 0.05:
+        print("События зависимы: априорная вероятность P(A) значительно отличается")
+        print("от апостериорной P(A|B). Данный признак является информативным.")
+    else:
+        print("События практически независимы.")
+    print("="*65)
+    # === 5. РАСЧЕТ ПО ФОРМУЛЕ БАЙЕСА ===
+
+    # 1. Априорная вероятность высокого дохода P(A)
+    p_high_income = cube.probability(event_A)
+
+    # 2. Априорная вероятность, что человек - женщина P(B)
+    p_female = cube.probability({'sex': 'Female'})
+
+    # 3. Условная вероятность (правдоподобие) P(A|B): доход >50K, если это женщина
+    p_high_income_given_female = sex_crosstab.loc['Female', '>50K']
+
+    # 4. Формула Байеса: P(B|A) = (P(A|B) * P(B)) / P(A)
+    # Вероятность того, что человек женщина, при условии, что доход >50K
+    p_female_given_high_income = (p_high_income_given_female * p_female) / p_high_income
+
+    print("="*65)
+    print("РАСЧЕТ ОБРАТНОЙ ВЕРОЯТНОСТИ ПО ТЕОРЕМЕ БАЙЕСА")
+    print("="*65)
+    print(f"1. Вероятность высокого дохода P(High Income): {p_high_income:.4f}")
+    print(f"2. Вероятность встретить женщину P(Female): {p_female:.4f}")
+    print(f"3. Вероятность, что женщина богата P(High Income | Female): {p_high_income_given_female:.4f}")
+    print("-" * 65)
+    print(f"РЕЗУЛЬТАТ (Байес):")
+    print(f"Вероятность P(Female | High Income) = {p_female_given_high_income:.4f}")
+    print("-" * 65)
+    print("ИНТЕРПРЕТАЦИЯ:")
+    print(f"Хотя среди женщин только {p_high_income_given_female*100:.1f}% имеют высокий доход,")
+    print(f"среди всех богатых людей женщины составляют {p_female_given_high_income*100:.1f}%.")
+    print("="*65)
+
+    # === 6. ДОВЕРИТЕЛЬНЫЕ ИНТЕРВАЛЫ (БУТСТРЕП ПО СЧЕТЧИКАМ КУБА) ===
+    # Реплики строятся как мультиномиальные выборки по ячейкам таблицы сопряженности,
+    # поэтому стоимость не зависит от числа записей в данных
+    with stage('topic3.bootstrap'):
+        intervals = probability_intervals(cube, {
+            'P(A | Male)': (event_A, {'sex': 'Male'}),
+            'P(A | Female)': (event_A, {'sex': 'Female'}),
+            'P(A | Doctorate)': (event_A, {'education': 'Doctorate'}),
+            'P(Female | A)': ({'sex': 'Female'}, event_A),
+        }, n_replicates=n_replicates, rng=make_generator(seed))
+    count('topic3.replicates', n_replicates)
+
+    print("="*65)
+    print(f"95%-НЫЕ ДОВЕРИТЕЛЬНЫЕ ИНТЕРВАЛЫ (бутстреп, {n_replicates} реплик)")
+    print("="*65)
+    for name, row in intervals.iterrows():
+        print(f"{name:<18} {row['estimate']:.4f}   [{row['low']:.4f}; {row['high']:.4f}]")
+    print("="*65)
+
+
+if __name__ == '__main__':
+    run()
@@ -1,73 +1,117 @@
-import numpy as np
-import matplotlib.pyplot as plt
-from scipy.stats import rv_continuous
-from scipy.integrate import quad
-
-# === 1. СОЗДАНИЕ КЛАССА РАСПРЕДЕЛЕНИЯ ===
-class MyDistribution(rv_continuous):
-    def _pdf(self, x):
-        # f(x) = 3/4 * (1 - x^2) на интервале [-1, 1]
-        # Эта функция не является стандартной (как нормальное или экспоненциальное)
-        return np.where((x >= -1) & (x <= 1), 0.75 * (1 - x**2), 0)
-
-# Инициализируем объект распределения на отрезке [-1, 1]
-my_rv = MyDistribution(a=-1, b=1, name='CustomParabolic')
-
-# === 2. ПРОВЕРКА И ГЕНЕРАЦИЯ ДАННЫХ ===
-norm_cond, _ = quad(my_rv.pdf, -1, 1)
-size = 2000  # Размер выборки для графиков
-sample = my_rv.rvs(size=size)
-
-# === 3. ВИЗУАЛИЗАЦИЯ (Как в примере) ===
-x_range = np.linspace(-1.3, 1.3, 500)
-fig, ax = plt.subplots(1, 2, figsize=(15, 6))
-
-# Левый график: Функция распределения (CDF)
-ax[0].hist(sample, bins=50, density=True, cumulative=True,
-           alpha=0.6, color='steelblue', label='Эмпирическая CDF')
-ax[0].plot(x_range, my_rv.cdf(x_range), 'r-', lw=2.5, label='Теоретическая CDF')
-ax[0].set_title('Функция распределения F(x)', fontsize=14)
-ax[0].grid(True, alpha=0.3)
-ax[0].legend()
-
-# Правый график: Плотность вероятности (PDF)
-ax[1].hist(sample, bins=50, density=True, alpha=0.6,
-           color='steelblue', label='Гистограмма выборки')
-ax[1].plot(x_range, my_rv.pdf(x_range), 'r-', lw=2.5, label='Теоретическая PDF')
-ax[1].set_title('Плотность вероятности f(x)', fontsize=14)
-ax[1].grid(True, alpha=0.3)
-ax[1].legend()
-
-plt.tight_layout()
-plt.show()
-
-# === 4. РАСЧЕТЫ ПО ЗАДАНИЮ ===
-
-# Вероятность попадания в интервал [a, b]
-a_int, b_int = -0.5, 0.5
-prob_interval = my_rv.cdf(b_int) - my_rv.cdf(a_int)
-
-# Характеристики
-mean = my_rv.mean()
-var = my_rv.var()
-std = my_rv.std()
-skew = my_rv.stats(moments='s')
-kurt = my_rv.stats(moments='k')
-
-# Квантили
-q = 0.8 # Квантиль уровня 0.8
-p_point = 0.05 # 5%-ная точка (квантиль уровня 0.05)
-
-print("-" * 50)
-print(f"1. Условие нормировки: {norm_cond:.4f}")
-print(f"2. Вероятность P({a_int} < X < {b_int}): {prob_interval:.4f}")
-print("-" * 50)
-print(f"3. Математическое ожидание (E): {mean:.4f}")
-print(f"4. Дисперсия (D): {var:.4f}")
-print(f"5. СКО (sigma): {std:.4f}")
-print(f"6. Коэффициент асимметрии: {skew:.4f}")
-print(f"7. Эксцесс: {kurt:.4f}")
-print("-" * 50)
-print(f"8. Квантиль уровня q={q}: {my_rv.ppf(q):.4f}")
-print(f"9. {p_point*100}%-ная точка: {my_rv.ppf(p_point):.4f}")
-print("-" * 50)
\ No newline at end of file
+import os
+
+from figures import show
+from instrumentation import count, stage
+
+
+def run(n_samples=10**7, seed=42, store_dir=os.path.join('data', 'samples'), out_dir=None):
+    """Собственное распределение, заданное плотностью: характеристики, квантили, выборка."""
+    import numpy as np
+    import matplotlib.pyplot as plt
+    from scipy.stats import rv_continuous
+
+    from moment_engine import distribution_moments
+    from sample_store import open_samples
+    from streaming_moments import accumulate
+    from tabulated_sampler import TabulatedSampler
+
+    # === 1. СОЗДАНИЕ КЛАССА РАСПРЕДЕЛЕНИЯ ===
+    class MyDistribution(rv_continuous):
+        def _pdf(self, x):
+            # f(x) = 3/4 * (1 - x^2) на интервале [-1, 1]
+            # Эта функция не является стандартной (как нормальное или экспоненциальное)
+            return np.where((x >= -1) & (x <= 1), 0.75 * (1 - x**2), 0)
+
+    # Инициализируем объект распределения на отрезке [-1, 1]
+    my_rv = MyDistribution(a=-1, b=1, name='CustomParabolic')
+
+    # Задана только плотность, поэтому cdf/ppf/rvs считаются по таблице CDF,
+    # построенной один раз (вместо численного интегрирования на каждый вызов)
+    sampler = TabulatedSampler(my_rv)
+
+    # === 2. ПРОВЕРКА И ГЕНЕРАЦИЯ ДАННЫХ ===
+    # Нормировка и моменты 1-4 считаются одной квадратурой и запоминаются
+    with stage('topic6.moments'):
+        moments = distribution_moments(my_rv)
+    norm_cond = moments.norm
+    # Выборка генерируется один раз в шарды на диске (повторные запуски ее переиспользуют);
+    # гистограмма и эмпирическая CDF накапливаются порциями по фиксированным интервалам
+    with stage('topic6.store'):
+        store = open_samples(os.path.join(store_dir, 'custom_parabolic'), sampler, n_samples, seed)
+    count('topic6.values', store.count)
+    with stage('topic6.histogram'):
+        hist = store.histogram(bins=50, range=(-1, 1))
+    edges, ecdf = hist.ecdf()
+
+    # === 3. ВИЗУАЛИЗАЦИЯ (Как в примере) ===
+    x_range = np.linspace(-1.3, 1.3, 500)
+    fig, ax = plt.subplots(1, 2, figsize=(15, 6))
+
+    # Левый график: Функция распределения (CDF)
+    ax[0].stairs(ecdf[1:], edges, fill=True,
+                 alpha=0.6, color='steelblue', label='Эмпирическая CDF')
+    ax[0].plot(x_range, sampler.cdf(x_range), 'r-', lw=2.5, label='Теоретическая CDF')
+    ax[0].set_title('Функция распределения F(x)', fontsize=14)
+    ax[0].grid(True, alpha=0.3)
+    ax[0].legend()
+
+    # Правый график: Плотность вероятности (PDF)
+    ax[1].stairs(hist.density(), edges, fill=True, alpha=0.6,
+                 color='steelblue', label='Гистограмма выборки')
+    ax[1].plot(x_range, my_rv.pdf(x_range), 'r-', lw=2.5, label='Теоретическая PDF')
+    ax[1].set_title('Плотность вероятности f(x)', fontsize=14)
+    ax[1].grid(True, alpha=0.3)
+    ax[1].legend()
+
+    plt.tight_layout()
+    show('custom', out_dir)
+
+    # === 4. РАСЧЕТЫ ПО ЗАДАНИЮ ===
+
+    # Вероятность попадания в интервал [a, b]
+    a_int, b_int = -0.5, 0.5
+    prob_interval = sampler.cdf(b_int) - sampler.cdf(a_int)
+
+    # Характеристики
+    mean = moments.mean
+    var = moments.var
+    std = moments.std
+    skew = moments.skew
+    kurt = moments.kurtosis
+
+    # Квантили
+    q = 0.8 # Квантиль уровня 0.8
+    p_point = 0.05 # 5%-ная точка (квантиль уровня 0.05)
+
+    print("-" * 50)
+    print(f"1. Условие нормировки: {norm_cond:.4f}")
+    print(f"2. Вероятность P({a_int} < X < {b_int}): {prob_interval:.4f}")
+    print("-" * 50)
+    print(f"3. Математическое ожидание (E): {mean:.4f}")
+    print(f"4. Дисперсия (D): {var:.4f}")
+    print(f"5. СКО (sigma): {std:.4f}")
+    print(f"6. Коэффициент асимметрии: {skew:.4f}")
+    print(f"7. Эксцесс: {kurt:.4f}")
+    print("-" * 50)
+    print(f"8. Квантиль уровня q={q}: {sampler.ppf(q):.4f}")
+    print(f"9. {p_point*100}%-ная точка: {sampler.ppf(p_point):.4f}")
+    print(f"   (погрешность табличной CDF: {sampler.error():.1e})")
+    with stage('topic6.quantiles'):
+        fine = store.histogram(bins=20000, range=(-1, 1))
+    print(f"   по выборке N={store.count:,}: {fine.quantile(q):.4f} и {fine.quantile(p_point):.4f}")
+    print("-" * 50)
+
+    # === 5. ПРОВЕРКА ХАРАКТЕРИСТИК ПО ВЫБОРКЕ ===
+    # Выборка читается из шардов порциями, моменты накапливаются при постоянной памяти
+    print(f"{'N':>10} {'E':>9} {'D':>9} {'Асимм.':>9} {'Эксцесс':>9}")
+    report = lambda snap: print(f"{snap['n']:>10} {snap['mean']:>9.4f} {snap['var']:>9.4f} "
+                                f"{snap['skew']:>9.4f} {snap['kurtosis']:>9.4f}")
+    with stage('topic6.stream_moments'):
+        acc, _ = accumulate(store.chunks(10**5),
+                            checkpoints=np.logspace(4, 7, 4).astype(int), on_checkpoint=report)
+    print(f"{'Теория':>10} {mean:>9.4f} {var:>9.4f} {skew:>9.4f} {kurt:>9.4f}")
+    print("-" * 50)
+
+
+if __name__ == '__main__':
+    run()
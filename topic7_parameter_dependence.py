@@ -1,63 +1,139 @@
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy.stats import lognorm
+import os
+from functools import partial
 
-# === 1. ИССЛЕДОВАНИЕ ЗАВИСИМОСТИ ПЛОТНОСТИ ОТ ПАРАМЕТРА (SHAPE) ===
-x = np.linspace(0, 5, 500)
-sigmas = [0.25, 0.5, 1.0] # Параметры формы (sigma)
-mu = 0 # Зафиксируем среднее логарифма
+from figures import show
+from instrumentation import count, stage
 
-plt.figure(figsize=(12, 6))
 
-for s in sigmas:
+def run(n_samples=10**7, seed=42, tol=1e-3, store_dir=os.path.join('data', 'samples'),
+        out_dir=None):
+    """Логнормальное распределение: зависимость от параметров и проверка формул."""
+    import numpy as np
+    import matplotlib.pyplot as plt
+    from scipy.stats import lognorm
+
+    from param_sweep import first_crossing, sweep, sweep_moments
+    from parallel_engine import make_generator
+    from sequential_mc import sequential_moments
+    from sample_store import open_samples
+    from streaming_moments import accumulate, sampled_moments
+
+    # === 1. ИССЛЕДОВАНИЕ ЗАВИСИМОСТИ ПЛОТНОСТИ ОТ ПАРАМЕТРА (SHAPE) ===
+    x = np.linspace(0, 5, 500)
+    sigmas = [0.25, 0.5, 1.0] # Параметры формы (sigma)
+    mu = 0 # Зафиксируем среднее логарифма
+
+    plt.figure(figsize=(12, 6))
+
+    # Плотности для всех sigma - одним расчетом по сетке (sigma x x)
     # В scipy.stats.lognorm: s - параметр формы, scale = exp(mu)
-    pdf = lognorm.pdf(x, s, scale=np.exp(mu))
-    plt.plot(x, pdf, label=f'sigma (shape) = {s}')
-
-plt.title('Изменение плотности логнормального распределения при разных $\sigma$')
-plt.xlabel('x')
-plt.ylabel('f(x)')
-plt.legend()
-plt.grid(True, alpha=0.3)
-plt.show()
-
-# === 2. ПРОВЕРКА ФОРМУЛ ХАРАКТЕРИСТИК ДЛЯ СГЕНЕРИРОВАННЫХ ДАННЫХ ===
-
-# Параметры для эксперимента
-s_exp = 0.5
-mu_exp = 0
-scale_exp = np.exp(mu_exp)
-n_samples = 10000
-
-# Генерация данных
-data = lognorm.rvs(s_exp, scale=scale_exp, size=n_samples, random_state=42)
-
-# Теоретические расчеты по формулам
-theoretical_mean = np.exp(mu_exp + (s_exp**2)/2)
-theoretical_var = (np.exp(s_exp**2) - 1) * np.exp(2*mu_exp + s_exp**2)
-
-# Эмпирические (статистические) значения
-empirical_mean = np.mean(data)
-empirical_var = np.var(data)
-
-# === ВЫВОД РЕЗУЛЬТАТОВ ===
-print("-" * 50)
-print(f"ПАРАМЕТРЫ: sigma = {s_exp}, mu = {mu_exp}")
-print("-" * 50)
-print(f"Математическое ожидание (Теория): {theoretical_mean:.4f}")
-print(f"Математическое ожидание (Эмпирика): {empirical_mean:.4f}")
-print(f"Разница: {abs(theoretical_mean - empirical_mean):.4f}")
-print("-" * 50)
-print(f"Дисперсия (Теория): {theoretical_var:.4f}")
-print(f"Дисперсия (Эмпирика): {empirical_var:.4f}")
-print(f"Разница: {abs(theoretical_var - empirical_var):.4f}")
-print("-" * 50)
-
-# Визуализация сгенерированных данных
-plt.figure(figsize=(10, 5))
-sns.histplot(data, bins=50, kde=True, color='green', stat="density", alpha=0.4)
-plt.axvline(empirical_mean, color='red', linestyle='--', label=f'E(X) = {empirical_mean:.2f}')
-plt.title(f'Гистограмма сгенерированных данных ($N={n_samples}$)')
-plt.legend()
-plt.show()
\ No newline at end of file
+    with stage('topic7.sweep_pdf'):
+        pdfs = sweep(lognorm, x, what=('pdf',), s=sigmas, scale=np.exp(mu))['pdf'][:, 0]
+    for s, pdf in zip(sigmas, pdfs):
+        plt.plot(x, pdf, label=f'sigma (shape) = {s}')
+
+    plt.title('Изменение плотности логнормального распределения при разных $\sigma$')
+    plt.xlabel('x')
+    plt.ylabel('f(x)')
+    plt.legend()
+    plt.grid(True, alpha=0.3)
+    show('density_vs_sigma', out_dir)
+
+    # Плотная сетка (sigma x mu x x): CDF считается порциями в пределах бюджета памяти,
+    # медиана ищется как пересечение CDF уровня 0.5 и сравнивается с формулой exp(mu)
+    sigma_grid = np.linspace(0.1, 1.5, 200)
+    mu_grid = np.linspace(-1, 1, 100)
+    with stage('topic7.sweep_cdf'):
+        surface = sweep(lognorm, x, what=('cdf',), s=sigma_grid, scale=np.exp(mu_grid))['cdf']
+    count('topic7.grid_points', surface.size)
+    median = first_crossing(surface, x, 0.5)
+    print(f"Сетка {surface.shape}: макс. отклонение медианы от exp(mu) = "
+          f"{np.nanmax(np.abs(median - np.exp(mu_grid))):.1e}")
+
+    # Характеристики по формулам на той же сетке параметров: при каком sigma
+    # дисперсия превышает 1 (для каждого mu)
+    with stage('topic7.sweep_moments'):
+        stats_grid = sweep_moments(lognorm, moments='mv', s=sigma_grid, scale=np.exp(mu_grid))
+    sigma_var1 = first_crossing(stats_grid['var'], sigma_grid, 1.0, axis=0)
+    for m, sv in list(zip(mu_grid, sigma_var1))[::25]:
+        print(f"mu = {m:+.2f}: D(X) > 1 при sigma > {sv:.3f}")
+
+    # === 2. ПРОВЕРКА ФОРМУЛ ХАРАКТЕРИСТИК ДЛЯ СГЕНЕРИРОВАННЫХ ДАННЫХ ===
+
+    # Параметры для эксперимента
+    s_exp = 0.5
+    mu_exp = 0
+    scale_exp = np.exp(mu_exp)
+
+    rng = make_generator(seed)
+    dist_exp = lognorm(s_exp, scale=scale_exp)
+    # Выборка хранится шардами на диске и переиспользуется между запусками и анализами
+    with stage('topic7.store'):
+        store = open_samples(os.path.join(store_dir, f'lognorm_s{s_exp}_mu{mu_exp}'),
+                             dist_exp, n_samples, seed)
+    count('topic7.values', store.count)
+
+    # Теоретические расчеты по формулам
+    theoretical_mean = np.exp(mu_exp + (s_exp**2)/2)
+    theoretical_var = (np.exp(s_exp**2) - 1) * np.exp(2*mu_exp + s_exp**2)
+
+    # Эмпирические (статистические) значения: моменты накапливаются по порциям
+    # при постоянной памяти, с промежуточными отчетами о сходимости
+    print(f"{'N':>10} {'E(X)':>10} {'D(X)':>10} {'|dE|':>10} {'|dD|':>10}")
+    report = lambda snap: print(f"{snap['n']:>10} {snap['mean']:>10.4f} {snap['var']:>10.4f} "
+                                f"{abs(snap['mean'] - theoretical_mean):>10.5f} "
+                                f"{abs(snap['var'] - theoretical_var):>10.5f}")
+    with stage('topic7.stream_moments'):
+        acc, history = accumulate(store.chunks(10**5),
+                                  checkpoints=np.logspace(5, 7, 5).astype(int), on_checkpoint=report)
+    empirical_mean = acc.mean
+    empirical_var = acc.var
+
+    # === ВЫВОД РЕЗУЛЬТАТОВ ===
+    print("-" * 50)
+    print(f"ПАРАМЕТРЫ: sigma = {s_exp}, mu = {mu_exp}")
+    print("-" * 50)
+    print(f"Математическое ожидание (Теория): {theoretical_mean:.4f}")
+    print(f"Математическое ожидание (Эмпирика): {empirical_mean:.4f}")
+    print(f"Разница: {abs(theoretical_mean - empirical_mean):.4f}")
+    print("-" * 50)
+    print(f"Дисперсия (Теория): {theoretical_var:.4f}")
+    print(f"Дисперсия (Эмпирика): {empirical_var:.4f}")
+    print(f"Разница: {abs(theoretical_var - empirical_var):.4f}")
+    print("-" * 50)
+
+    # Последовательная проверка: выборка растет, пока 95%-ные интервалы для E(X) и D(X)
+    # не станут уже ±tol (или не кончится бюджет в 10^8 значений)
+    with stage('topic7.sequential'):
+        seq = sequential_moments(partial(sampled_moments, dist=dist_exp), tol,
+                                 max_samples=10**8, rng=rng)
+    count('topic7.values', seq.n)
+    for name, est, low, high, theory in zip(['E(X)', 'D(X)'], seq.estimate, seq.low, seq.high,
+                                             [theoretical_mean, theoretical_var]):
+        print(f"{name}: {est:.4f} [{low:.4f}, {high:.4f}], теория {theory:.4f}")
+    print(f"Объем выборки для точности ±{tol}: N = {seq.n:,}")
+    print("-" * 50)
+
+    # Квантили по сохраненной выборке: гистограмма с мелкими интервалами, один проход
+    levels = [0.05, 0.5, 0.95]
+    with stage('topic7.quantiles'):
+        quantiles = store.histogram(bins=20000, range=(0, 10)).quantile(levels)
+    for level, value in zip(levels, quantiles):
+        print(f"Квантиль уровня {level}: выборка {value:.4f}, теория {dist_exp.ppf(level):.4f}")
+    print("-" * 50)
+
+    # Визуализация сгенерированных данных
+    plt.figure(figsize=(10, 5))
+    # Гистограмма по всей выборке накапливается порциями (выборка в память не загружается)
+    with stage('topic7.histogram'):
+        hist = store.histogram(bins=200, range=(0, 5))
+    plt.stairs(hist.density(), hist.edges, fill=True, color='green', alpha=0.4, label='Гистограмма')
+    plt.plot(x, dist_exp.pdf(x), color='darkgreen', label='Теоретическая плотность')
+    plt.axvline(empirical_mean, color='red', linestyle='--', label=f'E(X) = {empirical_mean:.2f}')
+    plt.title(f'Гистограмма сгенерированных данных ($N={store.count:,}$)')
+    plt.legend()
+    show('sample_histogram', out_dir)
+
+
+if __name__ == '__main__':
+    run()